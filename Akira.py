@@ -12,16 +12,27 @@ Experience time awareness, sleep cycles, and genuine personality development.
 import numpy as np
 import random
 import hashlib
+import heapq
 import math
 import json
+import signal
 import time
+import functools
+import threading
 from datetime import datetime, timedelta
-import ollama
 import os
 import sys
 from akira_memories import AkiraMemoryLogger
+from akira_logstore import memory_hashes
 from akira_personality import PersonalitySystem
 from akira_emotions import ComprehensiveMonitor
+from akira_learning import LearningWorker
+from akira_conversation import ConversationWindow
+from akira_models import CircuitOpenError, ModelRouter
+from akira_backends import OllamaBackend, StubBackend
+from akira_prompt import PromptBudget
+from akira_index import ContextIndex, MemoryIndex, MinHashIndex, StrengthStatistics, Vocabulary, jaccard_similarity
+from akira_store import HistoryBuffer, MemoryColumnStore, column_property
 
 #  AKIRA OPERATIONAL MODES
 #  Ghost Mode - Unconscious/Development mode (Akira is unaware)
@@ -33,20 +44,48 @@ from akira_emotions import ComprehensiveMonitor
 #Commands:
 #/help - Show all commands
 #/stats - Memory statistics
-#/memories - List all memories
-#/day - Advance one day
+#/memories [context] - List all memories (or those from one context)
+#/day [N] - Advance one day (or N days at once)
 #/sleep - Put Akira to sleep ( Memory consolidation)
 #/wake - Wake Akira from sleep
 #/ghost - Enter ghost mode (development/testing)
 #/status - Show current operational mode
+#/log query [hash=H] [type=T] [since=MS] [until=MS] [limit=N] - Search the activity log
+#/structured - Toggle single-call replies (reply + learnings in one model call)
 #/clear - Clear screen
 #/quit - Exit
 
+# Running product of the daily disuse factors (1 - 0.01 * days_unused), which only
+# apply once a memory has gone unused for more than 3 days and reach 0 at 100 days
+DISUSE_DECAY_PRODUCT = [1.0]
+for _days_unused in range(1, 101):
+    _factor = 1 - 0.01 * _days_unused if _days_unused > 3 else 1.0
+    DISUSE_DECAY_PRODUCT.append(DISUSE_DECAY_PRODUCT[-1] * _factor)
+
+def disuse_decay_factor(first_days_unused, last_days_unused):
+    """Combined disuse decay for the days after first_days_unused up to last_days_unused"""
+    if last_days_unused >= 100:
+        return 0.0
+    return DISUSE_DECAY_PRODUCT[last_days_unused] / DISUSE_DECAY_PRODUCT[max(0, first_days_unused)]
+
 # 🧠 Akira's Memory Class - Human-like memory mechanisms
 class AkiraMemory:
+    __slots__ = (
+        "content", "_original_content", "emotion_weight", "importance", "context",
+        "persistence_factor", "volatility_factor",
+        "base_strength", "retrieval_strength", "consolidation_strength", "interference_resistance",
+        "access_count", "last_accessed", "day_created", "content_hash", "memory_id", "token_ids",
+        "cached_strength", "cached_strength_epoch", "strength_history", "access_history",
+        "owner", "materialized_day"
+    )
+    
+    # Histories are bounded so a memory's footprint stays flat over months of days
+    STRENGTH_HISTORY_CAPACITY = 32
+    ACCESS_HISTORY_CAPACITY = 32
+    
     def __init__(self, content, emotion_weight, importance, context="general"):
         self.content = content
-        self.original_content = content
+        self._original_content = None  # Only stored once it differs from content
         self.emotion_weight = emotion_weight
         self.importance = importance
         self.context = context
@@ -66,12 +105,60 @@ class AkiraMemory:
         self.last_accessed = 0
         self.day_created = datetime.now()
         self.content_hash = hashlib.md5(content.encode()).hexdigest()[:8]
+        self.memory_id = None  # Assigned by the memory system
+        self.token_ids = None  # Sorted, unique vocabulary ids, set by the memory system
+        
+        # Strength snapshot, valid until the owning system's epoch changes or the memory is mutated
+        self.cached_strength = None
+        self.cached_strength_epoch = -1
+        
+        # Owning memory system and the last day decay was applied (lazy decay mode)
+        self.owner = None
+        self.materialized_day = 0
         
         # History tracking (initialize after persistence_factor!)
-        self.strength_history = [self.get_total_strength()]
-        self.access_history = []
+        # Older strength points are averaged together rather than dropped
+        self.strength_history = HistoryBuffer('f', self.STRENGTH_HISTORY_CAPACITY, downsample=True,
+                                              values=[self.get_total_strength()])
+        self.access_history = HistoryBuffer('I', self.ACCESS_HISTORY_CAPACITY)
+    
+    @property
+    def original_content(self):
+        """Content as first remembered"""
+        return self.content if self._original_content is None else self._original_content
+    
+    @original_content.setter
+    def original_content(self, value):
+        self._original_content = None if value == self.content else value
         
     def get_total_strength(self):
+        """Total memory strength, evaluated at most once per epoch unless the memory changes"""
+        owner = self.owner
+        if owner is not None and self.cached_strength_epoch == owner.strength_epoch:
+            return self.cached_strength
+        self.materialize()
+        return self.cache_strength(self.calculate_total_strength())
+    
+    def materialize(self):
+        """Apply any decay the owning system has deferred (lazy decay mode)"""
+        owner = self.owner
+        if owner is not None and owner.decay_deferred and self.materialized_day < owner.days:
+            owner.materialize(self)
+    
+    def cache_strength(self, strength):
+        """Store the strength snapshot for the current epoch"""
+        previous_strength = self.cached_strength
+        self.cached_strength = strength
+        if self.owner is not None:
+            self.cached_strength_epoch = self.owner.strength_epoch
+            self.owner.strength_changed(self, previous_strength)
+        return strength
+    
+    def invalidate_strength(self):
+        """Drop the strength snapshot after a mutation"""
+        self.cached_strength_epoch = -1
+    
+    def calculate_total_strength(self):
         """Calculate total memory strength from multiple components"""
         base = self.base_strength * self.persistence_factor
         retrieval_bonus = min(self.retrieval_strength * (self.access_count * 0.1), 0.4)
@@ -85,20 +172,23 @@ class AkiraMemory:
     
     def access_memory(self, current_day):
         """Strengthen memory when accessed"""
+        self.materialize()
         self.access_count += 1
         self.last_accessed = current_day
         self.access_history.append(current_day)
         self.retrieval_strength = min(0.95, self.retrieval_strength + 0.05)
         self.base_strength = min(0.9, self.base_strength + 0.02)
+        self.invalidate_strength()
     
-    def decay(self, current_day, all_memories):
+    def decay(self, current_day, all_memories, interference_decay=None):
         """Complex decay with multiple mechanisms"""
         # Time-based exponential decay
         time_decay = 0.02 * (1 / (1 + self.importance)) * (1 / (1 + self.emotion_weight))
         self.base_strength *= (1 - time_decay)
         
         # Interference from similar memories
-        interference_decay = self.calculate_interference(all_memories)
+        if interference_decay is None:
+            interference_decay = self.calculate_interference(all_memories)
         self.base_strength *= (1 - interference_decay * 0.1)
         
         # Lack of use decay
@@ -115,32 +205,120 @@ class AkiraMemory:
         if self.emotion_weight > 0.8:
             self.base_strength = max(self.base_strength, 0.3)
         
+        self.materialized_day = current_day
+        self.invalidate_strength()
+        self.strength_history.append(self.get_total_strength())
+    
+    def catch_up(self, current_day, interference_decay=0.0):
+        """Apply every day of decay and consolidation since materialized_day at once
+        
+        The daily factors are combined in closed form; random fluctuations come from
+        noise seeded per memory and day range, so catching up is reproducible.
+        """
+        start_day = self.materialized_day
+        elapsed = current_day - start_day
+        if elapsed <= 0:
+            return
+        
+        # Fields are read once into locals (on the numpy backend each read is a column lookup)
+        emotion_weight = self.emotion_weight
+        last_accessed = self.last_accessed
+        
+        # Time-based and interference decay compound geometrically
+        time_decay = 0.02 * (1 / (1 + self.importance)) * (1 / (1 + emotion_weight))
+        daily_factor = (1 - time_decay) * (1 - interference_decay * 0.1)
+        base_strength = self.base_strength * daily_factor ** elapsed
+        
+        # Random fluctuations: ~30% of days add uniform noise, each decayed by later days
+        noise = random.Random(hash((int(self.content_hash, 16), self.memory_id, start_day, current_day)))
+        attenuation = (1 - daily_factor ** (2 * elapsed)) / max(1 - daily_factor ** 2, 1e-12)
+        base_strength += noise.gauss(0, 0.1 * self.volatility_factor * math.sqrt(0.3 / 12 * attenuation))
+        
+        # Lack of use decay
+        self.retrieval_strength *= disuse_decay_factor(start_day - last_accessed, current_day - last_accessed)
+        
+        # Emotional memory protection
+        if emotion_weight > 0.8:
+            base_strength = max(base_strength, 0.3)
+        self.base_strength = base_strength
+        
+        # Sleep consolidation runs every third day
+        consolidations = current_day // 3 - start_day // 3
+        if consolidations:
+            self.consolidate(consolidations)
+        
+        self.materialized_day = current_day
+        self.invalidate_strength()
         self.strength_history.append(self.get_total_strength())
     
     def calculate_interference(self, all_memories):
         """Calculate interference from similar memories"""
-        interference = 0
-        my_words = set(self.original_content.lower().split())
+        similar_memories = []
         
         for other_memory in all_memories:
             if other_memory.content_hash != self.content_hash:
-                other_words = set(other_memory.original_content.lower().split())
-                similarity = len(my_words.intersection(other_words)) / max(len(my_words.union(other_words)), 1)
+                similarity = jaccard_similarity(self.token_ids, other_memory.token_ids)
                 
                 if similarity > 0.3:
-                    strength_difference = other_memory.get_total_strength() - self.get_total_strength()
-                    if strength_difference > 0:
-                        interference += similarity * 0.2 * (1 - self.interference_resistance)
+                    similar_memories.append((other_memory, similarity))
+        
+        return self.interference_from(similar_memories)
+    
+    def interference_from(self, similar_memories, last_known=False):
+        """Interference from (memory, similarity) pairs already known to be similar
+        
+        last_known compares the most recent strength snapshots instead of current
+        strengths, so deferred decay isn't forced onto every neighbour.
+        """
+        weight = 0.2 * (1 - self.interference_resistance)
+        if weight <= 0:
+            return 0.0
+        cap = 0.5 / weight  # Snapshots are side-effect free, so stop once interference is capped
+        
+        total_similarity = 0
+        if last_known:
+            my_strength = self.cached_strength
+            for other_memory, similarity in similar_memories:
+                if other_memory.cached_strength > my_strength:
+                    total_similarity += similarity
+                    if total_similarity >= cap:
+                        break
+        else:
+            my_strength = self.get_total_strength()
+            for other_memory, similarity in similar_memories:
+                if other_memory.get_total_strength() > my_strength:
+                    total_similarity += similarity
         
-        return min(interference, 0.5)
+        return min(total_similarity * weight, 0.5)
     
-    def consolidate(self):
+    def consolidate(self, cycles=1):
         """Memory consolidation during 'sleep' cycles"""
         if self.access_count > 0 or self.importance > 0.6:
             consolidation_gain = 0.05 * (self.importance + self.emotion_weight) / 2
-            self.consolidation_strength = min(0.95, self.consolidation_strength + consolidation_gain)
+            self.consolidation_strength = min(0.95, self.consolidation_strength + consolidation_gain * cycles)
         else:
-            self.consolidation_strength *= 0.98
+            self.consolidation_strength *= 0.98 ** cycles
+        self.invalidate_strength()
+
+# 🧠 Memory backed by a row of the column store (numpy backend)
+class AkiraMemoryView(AkiraMemory):
+    __slots__ = ("store", "row")
+    
+    base_strength = column_property("base_strength")
+    retrieval_strength = column_property("retrieval_strength")
+    consolidation_strength = column_property("consolidation_strength")
+    importance = column_property("importance")
+    emotion_weight = column_property("emotion_weight")
+    persistence_factor = column_property("persistence_factor")
+    volatility_factor = column_property("volatility_factor")
+    last_accessed = column_property("last_accessed", int)
+    access_count = column_property("access_count", int)
+    
+    def __init__(self, store, content, emotion_weight, importance, context="general"):
+        # Claim the row before AkiraMemory starts writing strength values
+        self.store = store
+        self.row = store.allocate()
+        super().__init__(content, emotion_weight, importance, context)
 
 # 🕒 Akira's Time Awareness System
 class AkiraTimeAwareness:
@@ -241,18 +419,78 @@ class AkiraTimeAwareness:
         return context
 
 # 🧠 Akira's Memory System with advanced features
+def synchronized(method):
+    """Run a memory system method while holding the system's lock"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
 class AkiraMemorySystem:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, recall_limit=8, recall_candidates=32, backend="objects",
+                 use_lsh=True, decay_mode="eager"):
         self.memories = []
         self.days = 0
         self.sleep_cycles = 0
-        self.conversation_history = []
+        
+        # Bumped once per chat turn and per day tick; cached strengths from older epochs are re-evaluated
+        self.strength_epoch = 0
+        
+        self.conversation_history = []  # Recent turns only; see ConversationWindow
+        self.conversation_summary = ""  # Rolling summary of turns that left the window
+        self.summary_backlog = []  # Turns that left the window but aren't summarized yet
         self.logger = logger
         
+        # Guards memory state shared with the background learning worker (re-entrant)
+        self.lock = threading.RLock()
+        
+        # Content is tokenized once into interned ids; the vocabulary keeps term statistics
+        self.vocabulary = Vocabulary()
+        
+        # Token index so recall only looks at memories sharing a query word
+        self.index = MemoryIndex(self.vocabulary)
+        self.memory_lookup = {}
+        self.next_memory_id = 0
+        self.recall_limit = recall_limit  # Most memories recalled per query
+        self.recall_candidates = recall_candidates  # Best-ranked matches considered per query
+        
+        # "objects" keeps state on each AkiraMemory, "numpy" keeps it in contiguous columns
+        if backend not in ("objects", "numpy"):
+            raise ValueError(f"Unknown memory backend: {backend}")
+        self.backend = backend
+        self.store = MemoryColumnStore() if backend == "numpy" else None
+        
+        # "eager" decays every memory each day, "lazy" only when a memory is next read
+        if decay_mode not in ("eager", "lazy"):
+            raise ValueError(f"Unknown decay mode: {decay_mode}")
+        self.lazy_decay = decay_mode == "lazy"
+        self.decay_deferred = self.lazy_decay  # Also set while fast-forwarding in eager mode
+        
+        # Context -> memories, with running strength totals per context
+        self.context_index = ContextIndex()
+        
+        # Totals, strong/weak counts and a strength histogram kept up to date incrementally
+        self.strength_stats = StrengthStatistics()
+        
+        # MinHash/LSH buckets so interference only compares likely-similar pairs (always
+        # verified exactly); use_lsh=False keeps the brute-force scan
+        self.similarity_index = MinHashIndex() if use_lsh else None
+        
+        # memory_id -> [(memory, similarity)] above 0.3, found once when a memory is registered
+        self.interference_neighbours = {}
+        
+    def create_memory(self, content, emotion, importance, context="general"):
+        """Build a memory object for the configured backend (not yet stored)"""
+        if self.store is not None:
+            return AkiraMemoryView(self.store, content, emotion, importance, context)
+        return AkiraMemory(content, emotion, importance, context)
+    
+    @synchronized
     def add_memory(self, content, emotion, importance, context="general"):
         """Add new memory with context"""
-        memory = AkiraMemory(content, emotion, importance, context)
-        self.memories.append(memory)
+        memory = self.create_memory(content, emotion, importance, context)
+        self.register_memory(memory)
         self.process_interference_effects(memory)
         
         # Log memory creation
@@ -261,28 +499,116 @@ class AkiraMemorySystem:
         
         return memory
     
+    def register_memory(self, memory):
+        """Store a memory and make it searchable"""
+        memory.memory_id = self.next_memory_id
+        self.next_memory_id += 1
+        memory.owner = self
+        memory.materialized_day = self.days
+        # Evaluate from the current fields (a restored memory's differ from construction) before seeding the aggregates
+        memory.cached_strength = memory.calculate_total_strength()
+        memory.cached_strength_epoch = self.strength_epoch
+        
+        token_ids = self.vocabulary.encode(memory.content)
+        memory.token_ids = Vocabulary.unique_sorted(token_ids)
+        
+        self.memories.append(memory)
+        self.memory_lookup[memory.memory_id] = memory
+        self.index.add(memory.memory_id, token_ids)
+        self.context_index.add(memory.memory_id, memory.context, memory.cached_strength)
+        self.strength_stats.add(memory.cached_strength)
+        if self.similarity_index is not None:
+            self.similarity_index.add(memory.memory_id, memory.token_ids)
+        self.record_similar_pairs(memory)
+    
+    def record_similar_pairs(self, memory):
+        """Record a new memory's interference pairs in both directions (content never changes after registration)"""
+        neighbours = self.interference_neighbours[memory.memory_id] = []
+        for other_memory, similarity in self.find_similar_memories(memory, 0.3):
+            if other_memory.content_hash == memory.content_hash:
+                continue
+            neighbours.append((other_memory, similarity))
+            self.interference_neighbours[other_memory.memory_id].append((memory, similarity))
+            if self.store is not None:
+                self.store.add_pair(memory.row, other_memory.row, similarity * 0.2 * (1 - memory.interference_resistance))
+                self.store.add_pair(other_memory.row, memory.row, similarity * 0.2 * (1 - other_memory.interference_resistance))
+    
+    def strength_changed(self, memory, previous_strength):
+        """Keep strength aggregates in step when a memory's strength is re-evaluated"""
+        self.context_index.update_strength(memory.memory_id, memory.context, memory.cached_strength)
+        self.strength_stats.update(previous_strength, memory.cached_strength)
+    
+    @synchronized
+    def clear_memories(self):
+        """Forget every memory (used before restoring a saved state); the vocabulary is kept"""
+        self.memories = []
+        self.memory_lookup = {}
+        self.interference_neighbours = {}
+        self.index.clear()
+        self.context_index.clear()
+        self.strength_stats.clear()
+        if self.similarity_index is not None:
+            self.similarity_index.clear()
+        if self.store is not None:
+            self.store.clear()
+    
     def process_interference_effects(self, new_memory):
         """Process how new memory affects existing memories"""
-        for existing_memory in self.memories[:-1]:
-            similarity = self.calculate_memory_similarity(new_memory, existing_memory)
-            if similarity > 0.4:
-                interference_amount = similarity * 0.1 * (1 - existing_memory.interference_resistance)
-                existing_memory.base_strength *= (1 - interference_amount)
+        for existing_memory, similarity in self.find_similar_memories(new_memory, 0.4):
+            interference_amount = similarity * 0.1 * (1 - existing_memory.interference_resistance)
+            existing_memory.base_strength *= (1 - interference_amount)
+            existing_memory.invalidate_strength()
+    
+    def find_similar_memories(self, memory, threshold):
+        """(memory, similarity) pairs for other memories more similar than threshold"""
+        if self.similarity_index is None:
+            similar = []
+            for other_memory in self.memories:
+                if other_memory is not memory:
+                    similarity = self.calculate_memory_similarity(memory, other_memory)
+                    if similarity > threshold:
+                        similar.append((other_memory, similarity))
+            return similar
+        
+        return [(self.memory_lookup[memory_id], similarity)
+                for memory_id, similarity in self.similarity_index.similar(memory.memory_id, threshold)]
+    
+    def memory_interference(self, memory, last_known=False):
+        """Interference decay for one memory from its neighbours recorded at registration"""
+        return memory.interference_from(self.interference_neighbours[memory.memory_id], last_known)
+    
+    def materialize(self, memory):
+        """Bring one memory's deferred decay up to the current day"""
+        memory.catch_up(self.days, self.memory_interference(memory, last_known=True))
+    
+    @synchronized
+    def materialize_all(self):
+        """Apply all deferred decay (before saving or snapshotting in lazy mode)"""
+        if self.lazy_decay:
+            for memory in self.memories:
+                memory.materialize()
     
     def calculate_memory_similarity(self, mem1, mem2):
         """Calculate semantic similarity between memories"""
-        words1 = set(mem1.content.lower().split())
-        words2 = set(mem2.content.lower().split())
-        if len(words1.union(words2)) == 0:
-            return 0
-        return len(words1.intersection(words2)) / len(words1.union(words2))
+        return jaccard_similarity(mem1.token_ids, mem2.token_ids)
+    
+    def begin_strength_epoch(self):
+        """Start a new strength epoch (each turn and day tick) so every memory re-evaluates its strength once"""
+        self.strength_epoch += 1
     
+    @synchronized
     def advance_day(self):
         """Simulate passage of time"""
         self.days += 1
+        self.begin_strength_epoch()
         
-        for memory in self.memories:
-            memory.decay(self.days, self.memories)
+        if self.lazy_decay:
+            pass  # Memories catch up on their own decay when they are next read
+        elif self.store is not None:
+            self.vectorized_decay()
+        else:
+            for memory in self.memories:
+                memory.decay(self.days, self.memories, self.memory_interference(memory))
         
         # Random memory access (mind wandering)
         random_activations = []
@@ -300,19 +626,111 @@ class AkiraMemorySystem:
         if self.logger:
             self.logger.log_day_advance(self.days, self.get_stats(), random_activations)
     
+    @synchronized
+    def advance_days(self, days):
+        """Fast-forward several days at once
+        
+        Decay is applied in closed form, mind-wandering and context activations are
+        drawn for the whole span up front and replayed in day order, and a single
+        summarized event is logged.
+        """
+        if days <= 0:
+            return
+        start_day = self.days
+        end_day = start_day + days
+        self.begin_strength_epoch()
+        
+        activations = self._draw_batched_activations(start_day, end_day)
+        random_activations = [memory.content[:50] for day, memory, is_random in activations if is_random]
+        
+        # Replay activations in order; each memory catches up to its access day first
+        self.decay_deferred = True
+        try:
+            for day, memory, is_random in activations:
+                self.days = day
+                memory.access_memory(day)
+            self.days = end_day
+            
+            if not self.lazy_decay:
+                for memory in self.memories:
+                    memory.materialize()
+        finally:
+            self.decay_deferred = self.lazy_decay
+        
+        # Every third day is a sleep cycle; memories apply them as they catch up
+        self.sleep_cycles += end_day // 3 - start_day // 3
+        
+        if self.logger:
+            self.logger.log_day_advance(self.days, self.get_stats(),
+                                        random_activations, days_advanced=days)
+    
+    def _draw_batched_activations(self, start_day, end_day):
+        """(day, memory, is_random) accesses that advance_day would make over a span of days"""
+        if not self.memories:
+            return []
+        days = end_day - start_day
+        day_range = range(start_day + 1, end_day + 1)
+        
+        # Mind wandering: one random memory on ~30% of days
+        activation_days = random.sample(day_range, np.random.binomial(days, 0.3))
+        activations = [(day, random.choice(self.memories), True) for day in activation_days]
+        
+        # Context activation: a context is picked per day in proportion to its size,
+        # then each of its memories is accessed with 20% chance that day
+        if len(self.memories) > 1:
+            names = self.context_index.contexts()
+            weights = np.array([self.context_index.count(name) for name in names], dtype=np.float64)
+            picked = np.random.choice(len(names), size=days, p=weights / weights.sum())
+            
+            for position, name in enumerate(names):
+                context_days = [day for day, choice in zip(day_range, picked) if choice == position]
+                if not context_days:
+                    continue
+                members = self.memories_in_context(name)
+                access_counts = np.random.binomial(len(context_days), 0.2, size=len(members))
+                for memory, count in zip(members, access_counts.tolist()):
+                    for day in random.sample(context_days, count):
+                        activations.append((day, memory, False))
+        
+        activations.sort(key=lambda activation: activation[0])
+        return activations
+    
+    def vectorized_decay(self):
+        """Decay every memory in one pass over the column store"""
+        # Similar pairs are recorded at registration, so interference is one pass over the pair columns
+        interference = self.store.interference(self.store.total_strength())
+        strengths = self.store.decay(self.days, interference).tolist()
+        
+        for memory in self.memories:
+            memory.materialized_day = self.days
+            memory.strength_history.append(memory.cache_strength(strengths[memory.row]))
+    
     def context_based_activation(self):
         """Simulate context-dependent memory activation"""
         if len(self.memories) > 1:
-            contexts = [mem.context for mem in self.memories]
-            if contexts:
-                active_context = random.choice(contexts)
-                for memory in self.memories:
-                    if memory.context == active_context and random.random() < 0.2:
-                        memory.access_memory(self.days)
+            # Contexts are picked in proportion to their size, as if picking a random memory's context
+            active_context = self.context_index.random_context(random)
+            for memory in self.memories_in_context(active_context):
+                if random.random() < 0.2:
+                    memory.access_memory(self.days)
+    
+    @synchronized
+    def memories_in_context(self, context):
+        """Memories filed under a context, oldest first"""
+        return [self.memory_lookup[memory_id] for memory_id in self.context_index.memory_ids(context)]
+    
+    @synchronized
+    def get_context_stats(self):
+        """Memory count and average strength for each context"""
+        return self.context_index.stats()
     
+    @synchronized
     def sleep_consolidation(self):
         """Simulate memory consolidation during sleep"""
         self.sleep_cycles += 1
+        if self.lazy_decay:
+            return  # Consolidation is applied when each memory catches up
+        
         for memory in self.memories:
             memory.consolidate()
         
@@ -320,13 +738,20 @@ class AkiraMemorySystem:
         if self.logger:
             self.logger.log_consolidation(self.memories, self.sleep_cycles)
     
-    def recall_memory(self, query):
-        """Attempt to recall memories based on query"""
+    @synchronized
+    def recall_memory(self, query, with_scores=False):
+        """Attempt to recall memories based on query
+        
+        with_scores returns (memory, recall score) pairs, the score combining
+        match, strength and recency.
+        """
         recalled_memories = []
-        query_words = set(query.lower().split())
+        recall_scores = []
+        query_ids = self.vocabulary.lookup(query)
         
-        for memory in self.memories:
-            content_match = len(set(memory.content.lower().split()).intersection(query_words))
+        # Only memories sharing a word with the query are candidates, best matches first
+        for memory_id, match_score, content_match in self.index.search(query_ids, self.recall_candidates):
+            memory = self.memory_lookup[memory_id]
             strength_factor = memory.get_total_strength()
             recency_factor = 1.0 / (1 + (self.days - memory.last_accessed) * 0.1)
             
@@ -336,70 +761,159 @@ class AkiraMemorySystem:
             if random.random() < recall_probability * 0.8:
                 memory.access_memory(self.days)
                 recalled_memories.append(memory)
+                recall_scores.append(recall_probability)
+                if len(recalled_memories) >= self.recall_limit:
+                    break
         
         # Log memory recall
         if self.logger:
             self.logger.log_memory_recall(query, recalled_memories)
         
+        if with_scores:
+            return list(zip(recalled_memories, recall_scores))
         return recalled_memories
     
+    @synchronized
     def get_memory_context_for_ai(self):
-        """Get current memory state for AI context"""
-        active_memories = [mem for mem in self.memories if mem.get_total_strength() > 0.3]
-        weak_memories = [mem for mem in self.memories if mem.get_total_strength() <= 0.3]
-        
+        """Get current memory state for AI context (counts, plus top memories on demand)"""
         context = {
-            "active_memories": [{"content": mem.content, "strength": mem.get_total_strength(), 
-                               "context": mem.context, "emotion": mem.emotion_weight} for mem in active_memories],
-            "weak_memories_count": len(weak_memories),
+            "active_memories_count": self.strength_stats.active,
+            "weak_memories_count": self.strength_stats.total - self.strength_stats.active,
             "total_memories": len(self.memories),
             "days_lived": self.days,
-            "sleep_cycles": self.sleep_cycles
+            "sleep_cycles": self.sleep_cycles,
+            "top_memories": self.get_top_memories
         }
         return context
     
+    @synchronized
+    def get_top_memories(self, count=5):
+        """The strongest memories, described for the AI (scans every memory, so only call when needed)"""
+        strongest = heapq.nlargest(count, self.memories, key=lambda mem: mem.get_total_strength())
+        return [{"content": mem.content, "strength": mem.get_total_strength(),
+                 "context": mem.context, "emotion": mem.emotion_weight} for mem in strongest]
+    
+    @synchronized
     def get_stats(self):
-        """Get memory statistics"""
-        if not self.memories:
-            return {
-                "total": 0, 
-                "avg_strength": 0, 
-                "strong": 0, 
-                "weak": 0,
-                "days": self.days,
-                "sleep_cycles": self.sleep_cycles
-            }
-        
-        strengths = [mem.get_total_strength() for mem in self.memories]
+        """Get memory statistics from the running aggregates
+        
+        Strengths are the last value each memory was evaluated at; in lazy decay
+        mode, decay shows up here once a memory is next read.
+        """
+        stats = self.strength_stats
         return {
-            "total": len(self.memories),
-            "avg_strength": np.mean(strengths),
-            "strong": len([s for s in strengths if s > 0.7]),
-            "weak": len([s for s in strengths if s < 0.3]),
+            "total": stats.total,
+            "avg_strength": stats.average,
+            "strong": stats.strong,
+            "weak": stats.weak,
             "days": self.days,
             "sleep_cycles": self.sleep_cycles
         }
 
+# Appended to the prompt when one call returns both the reply and what to remember
+STRUCTURED_REPLY_INSTRUCTIONS = """
+
+Answer with JSON only, in exactly this shape:
+{"reply": "what you say to them", "remember": ["1-2 short statements worth remembering from this conversation"]}"""
+
+def parse_structured_reply(text):
+    """(reply, learnings) from a structured JSON answer, or None if it can't be read"""
+    text = text.strip()
+    candidates = [text]
+    start, end = text.find('{'), text.rfind('}')
+    if 0 <= start < end:
+        candidates.append(text[start:end + 1])  # Tolerate code fences or chatter around the object
+    
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        
+        reply = data.get("reply")
+        if not isinstance(reply, str) or not reply.strip():
+            continue
+        
+        remember = data.get("remember", [])
+        if isinstance(remember, str):
+            remember = remember.split('\n')
+        elif not isinstance(remember, list):
+            remember = []
+        learnings = [str(item).strip() for item in remember if str(item).strip()]
+        return reply.strip(), learnings[:2]
+    
+    return None
+
 # 🧠 Akira's Consciousness System
 class AkiraConsciousness:
-    def __init__(self, model_name="llama3"):
-        self.logger = AkiraMemoryLogger()
-        self.memory_system = AkiraMemorySystem(self.logger)
+    def __init__(self, model_name="llama3", memory_backend="objects", decay_mode="eager", structured_replies=False,
+                 learning_model=None, summary_model=None, keep_alive="30m",
+                 ollama_host=None, connect_timeout=5.0, request_timeout=120.0, memory_prompt_tokens=400,
+                 backend=None, log_mode="buffered", log_backpressure="drop", log_store="segments"):
+        # Buffered logging keeps disk writes off the chat thread
+        self.logger = AkiraMemoryLogger(buffered=log_mode == "buffered", backpressure=log_backpressure,
+                                        store=log_store)
+        self.memory_system = AkiraMemorySystem(self.logger, backend=memory_backend, decay_mode=decay_mode)
         self.personality_system = PersonalitySystem()
         self.comprehensive_monitor = ComprehensiveMonitor(self.personality_system)
         self.time_system = AkiraTimeAwareness()
-        self.model_name = model_name
+        
+        # Every model call goes through one backend (Ollama unless a stand-in is given)
+        self.backend = backend if backend is not None else OllamaBackend(ollama_host, connect_timeout, request_timeout)
+        
+        # Per-task models: replies use model_name, learning/summaries a small model by default
+        routed_models = {"reply": model_name, "learning": learning_model, "summary": summary_model}
+        self.models = ModelRouter({task: model for task, model in routed_models.items() if model},
+                                  keep_alive, self.backend)
         
         # Development stages
         self.development_stage = 0  # 0=confused awakening, 1=learning basics, 2=personality emerging, 3=mature
         self.interactions_count = 0
         self.first_run = True
         
+        # Learning runs in the background after each reply; the next turn waits
+        # up to learning_wait seconds for it, then recalls without it
+        self.learning_worker = LearningWorker(self)
+        self.learning_wait = 10.0
+        
+        # Recent turns are sent as chat messages, older ones summarized and archived
+        self.conversation = ConversationWindow(self.memory_system)
+        
+        # Recalled memories are fitted into a fixed token budget, best scored first
+        self.prompt_budget = PromptBudget(memory_prompt_tokens)
+        
+        # Cached system prompt fragments: fragment name -> (cache key, text)
+        self.prompt_fragments = {}
+        
+        # Opt-in: one call returns the reply and its learnings, falling back to two calls
+        self.structured_replies = structured_replies
+        self.reply_learnings = None  # Learnings that came with the latest reply, if any
+        
+    @property
+    def model_name(self):
+        """Model used for replies"""
+        return self.models.models["reply"]
+    
+    @model_name.setter
+    def model_name(self, value):
+        self.models.models["reply"] = value
+    
     def chat_with_memory(self, user_input):
         """Chat with AI using memory context"""
+        chunks, recalled_memories = self.stream_chat_with_memory(user_input)
+        return "".join(chunks), recalled_memories
+    
+    def stream_chat_with_memory(self, user_input):
+        """Chat with AI using memory context, streaming the reply
+        
+        Returns (chunks, recalled_memories). chunks yields text as the model produces it;
+        emotion, history and development updates run once it is exhausted.
+        """
         # Check operational mode
         if self.time_system.operational_mode == "ghost":
-            return "👻 [Ghost Mode: Akira is unconscious and unaware. Use /wake to bring him back.]", []
+            return iter(["👻 [Ghost Mode: Akira is unconscious and unaware. Use /wake to bring him back.]"]), []
         
         if self.time_system.operational_mode == "sleep":
             # Akira is asleep - this is him being woken up
@@ -409,62 +923,122 @@ class AkiraConsciousness:
                 wake_context = self.time_system.get_sleep_wake_context()
                 user_input = f"[WAKE UP EVENT: You were just woken up. {user_input}]"
         
-        # Recall relevant memories
-        recalled_memories = self.memory_system.recall_memory(user_input)
-        memory_context = self.memory_system.get_memory_context_for_ai()
+        # Let the previous turn's learnings land before recalling (or go ahead without them)
+        self.learning_worker.wait_until_idle(self.learning_wait)
         
-        # Build prompt with memory context
-        prompt = self.build_memory_aware_prompt(user_input, recalled_memories, memory_context)
+        with self.memory_system.lock:
+            # Each turn sees fresh strengths, including that turn's fluctuation
+            self.memory_system.begin_strength_epoch()
+            
+            # Recall relevant memories
+            scored_memories = self.memory_system.recall_memory(user_input, with_scores=True)
+            recalled_memories = [memory for memory, score in scored_memories]
+            memory_context = self.memory_system.get_memory_context_for_ai()
+            
+            # Build prompt with memory context
+            recall_scores = {memory.memory_id: score for memory, score in scored_memories}
+            prompt = self.build_memory_aware_prompt(user_input, recalled_memories, memory_context, recall_scores)
+            
+            # Generate dynamic personality prompt with development stage (refreshes the
+            # personality's cached prompt fragment, which the learning worker also updates)
+            full_prompt = self.build_system_prompt(memory_context)
+            messages = ([{"role": "system", "content": full_prompt}] + self.conversation.messages()
+                        + [{"role": "user", "content": prompt}])
         
+        return self._stream_response(user_input, messages, recalled_memories), recalled_memories
+    
+    def _stream_response(self, user_input, messages, recalled_memories):
+        """Yield the model's reply as it arrives, then record the finished exchange"""
+        pieces = []
+        self.reply_learnings = None
         try:
-            # Generate dynamic personality prompt with development stage
-            personality_prompt = self.personality_system.generate_personality_prompt(memory_context)
-            development_modifier = self.get_development_prompt_modifier()
-            time_context = self.get_time_context_prompt()
-            full_prompt = personality_prompt + development_modifier + time_context
+            if self.structured_replies:
+                structured = self.structured_reply(messages)
+                if structured is not None:
+                    ai_response, self.reply_learnings = structured
+                    pieces.append(ai_response)
+                    yield ai_response
             
-            response = ollama.chat(model=self.model_name, messages=[
-                {"role": "system", "content": full_prompt},
-                {"role": "user", "content": prompt}
-            ])
-            ai_response = response['message']['content']
+            # Regular streamed reply (also the fallback when the structured answer can't be parsed)
+            if not pieces:
+                stream = self.models.chat("reply", messages, stream=True)
+                
+                for chunk in stream:
+                    piece = chunk['message']['content']
+                    if piece:
+                        pieces.append(piece)
+                        yield piece
             
+        except Exception as e:
+            separator = "\n" if pieces else ""
+            yield f"{separator}Error connecting to Ollama: {e}"
+            return
+        
+        self.record_exchange(user_input, "".join(pieces), recalled_memories)
+    
+    def structured_reply(self, messages):
+        """Reply and learnings from a single JSON-constrained call, or None if unreadable"""
+        prompt = messages[-1]["content"] + STRUCTURED_REPLY_INSTRUCTIONS
+        response = self.models.chat("reply", messages[:-1] + [{"role": "user", "content": prompt}],
+                                    format="json")
+        return parse_structured_reply(response['message']['content'])
+    
+    def take_reply_learnings(self):
+        """Learnings generated alongside the latest reply (None means extract them separately)"""
+        learnings, self.reply_learnings = self.reply_learnings, None
+        return learnings
+    
+    def record_exchange(self, user_input, ai_response, recalled_memories):
+        """Update emotional state, conversation history and development after a reply"""
+        with self.memory_system.lock:
             # Update emotional and personality state
             self.comprehensive_monitor.update_from_conversation(user_input, ai_response, recalled_memories)
             
-            # Store conversation in memory system
-            self.memory_system.conversation_history.append({
+            # Store conversation in the recent-turns window, summarizing older turns in the background
+            needs_summary = self.conversation.add_turn({
                 "user": user_input,
                 "ai": ai_response,
                 "day": self.memory_system.days,
                 "time": datetime.now().isoformat(),
                 "operational_mode": self.time_system.operational_mode
             })
+            if needs_summary:
+                self.learning_worker.submit_task(self.update_conversation_summary)
             
             # Update development stage
             self.interactions_count += 1
             self._update_development_stage()
-            
-            return ai_response, recalled_memories
-            
-        except Exception as e:
-            return f"Error connecting to Ollama: {e}", []
     
-    def build_memory_aware_prompt(self, user_input, recalled_memories, memory_context):
-        """Build prompt that includes memory state"""
+    def build_memory_aware_prompt(self, user_input, recalled_memories, memory_context, recall_scores=None):
+        """Build prompt that includes memory state
+        
+        Recalled memories are included best-first (by recall_scores, else strength)
+        until the prompt budget's memory tokens are used up.
+        """
         prompt = f"Someone just said to you: {user_input}\n\n"
         
-        if recalled_memories:
+        scored_lines = []
+        for mem in recalled_memories:
+            strength = mem.get_total_strength()
+            strength_desc = "clearly" if strength > 0.7 else "vaguely" if strength > 0.4 else "faintly"
+            score = recall_scores.get(mem.memory_id, strength) if recall_scores else strength
+            scored_lines.append((score, mem, f"- I {strength_desc} remember: {mem.content}\n"))
+        
+        selected, truncated, tokens_used = self.prompt_budget.select(scored_lines)
+        if truncated and self.logger:
+            self.logger.log_prompt_budget(len(recalled_memories), len(selected), truncated,
+                                          tokens_used, self.prompt_budget.memory_tokens)
+        
+        if selected:
             prompt += "This brings back some memories:\n"
-            for mem in recalled_memories:
-                strength_desc = "clearly" if mem.get_total_strength() > 0.7 else "vaguely" if mem.get_total_strength() > 0.4 else "faintly"
-                prompt += f"- I {strength_desc} remember: {mem.content}\n"
+            for mem, line in selected:
+                prompt += line
         else:
             prompt += "This doesn't bring back any specific memories right now.\n"
         
         # Add some memory context more naturally
-        if memory_context["active_memories"]:
-            prompt += f"\nI have quite a few things on my mind lately - about {len(memory_context['active_memories'])} clear thoughts"
+        if memory_context["active_memories_count"]:
+            prompt += f"\nI have quite a few things on my mind lately - about {memory_context['active_memories_count']} clear thoughts"
             if memory_context["weak_memories_count"] > 0:
                 prompt += f" and some things that feel a bit fuzzy"
             prompt += f". It's been {memory_context['days_lived']} days since I started really paying attention to my thoughts.\n"
@@ -473,56 +1047,89 @@ class AkiraConsciousness:
         
         return prompt
     
-    def learn_from_conversation(self, user_input, ai_response):
-        """Extract learnings from conversation and store as memories"""
-        stored_memories = []
-        
-        # Try AI-based learning first
-        try:
-            learning_prompt = f"""
+    def update_conversation_summary(self):
+        """Fold turns that left the conversation window into the rolling summary"""
+        self.conversation.update_summary(self.summarize_conversation)
+    
+    def summarize_conversation(self, summary, turns):
+        """Ask the summary model to extend summary with turns"""
+        exchanges = "\n".join(f"They said: {turn['user']}\nI said: {turn['ai']}" for turn in turns)
+        summary_prompt = f"""
+Summary of our conversation so far: {summary or "(nothing yet)"}
+
+What was said next:
+{exchanges}
+
+Update the summary to include what was said next. Keep it under 120 words, written from my point of view.
+Return only the summary."""
+
+        response = self.models.chat("summary", [
+            {"role": "user", "content": summary_prompt}
+        ])
+        return response['message']['content'].strip()
+    
+    def extract_learnings(self, user_input, ai_response):
+        """Ask the model for 1-2 things worth remembering from an exchange"""
+        learning_prompt = f"""
 Someone said: {user_input}
 I responded: {ai_response}
 
 What are 1-2 important things I should remember from this conversation? Think about what was meaningful or worth keeping in mind.
 Return only simple statements, one per line, no explanations."""
 
-            response = ollama.chat(model=self.model_name, messages=[
-                {"role": "user", "content": learning_prompt}
-            ])
-            learnings = response['message']['content'].strip().split('\n')
+        response = self.models.chat("learning", [
+            {"role": "user", "content": learning_prompt}
+        ])
+        return response['message']['content'].strip().split('\n')
+    
+    def learn_from_conversation(self, user_input, ai_response, learnings=None):
+        """Extract learnings from conversation and store as memories
+        
+        learnings already produced with the reply skip the extraction call.
+        """
+        stored_memories = []
+        
+        # Try AI-based learning first
+        try:
+            if learnings is None:
+                learnings = self.extract_learnings(user_input, ai_response)
             
-            for learning in learnings:
-                if learning.strip() and len(learning.strip()) > 10:  # Only store substantial learnings
-                    # Natural importance and emotion calculation
-                    base_importance = 0.3 + random.random() * 0.4
-                    base_emotion = 0.2 + random.random() * 0.3
-                    
-                    # Natural linguistic indicators (no hardcoded words)
-                    learning_text = learning.strip()
-                    
-                    # Content-based natural weighting
-                    if len(learning_text) > 50:  # Longer learnings might be more complex/important
-                        base_importance += 0.1
-                    
-                    if learning_text.count(',') > 2 or learning_text.count(';') > 0:  # Complex structure
-                        base_importance += 0.1
+            # Store and evolve under the memory lock; this runs on the learning worker
+            with self.memory_system.lock:
+                for learning in learnings:
+                    if learning.strip() and len(learning.strip()) > 10:  # Only store substantial learnings
+                        # Natural importance and emotion calculation
+                        base_importance = 0.3 + random.random() * 0.4
+                        base_emotion = 0.2 + random.random() * 0.3
+                        
+                        # Natural linguistic indicators (no hardcoded words)
+                        learning_text = learning.strip()
+                        
+                        # Content-based natural weighting
+                        if len(learning_text) > 50:  # Longer learnings might be more complex/important
+                            base_importance += 0.1
+                        
+                        if learning_text.count(',') > 2 or learning_text.count(';') > 0:  # Complex structure
+                            base_importance += 0.1
+                        
+                        if any(char in learning_text for char in '!?'):  # Emotional punctuation
+                            base_emotion += 0.2
+                        
+                        # Final natural bounds
+                        importance = min(1.0, max(0.1, base_importance))
+                        emotion = min(1.0, max(0.1, base_emotion))
+                        
+                        memory = self.memory_system.add_memory(learning.strip(), emotion, importance, "conversation")
+                        stored_memories.append(memory)
+                        
+                        # Evolve personality based on new memory
+                        self.personality_system.evolve_personality_from_memory(memory)
                         
-                    if any(char in learning_text for char in '!?'):  # Emotional punctuation
-                        base_emotion += 0.2
-                    
-                    # Final natural bounds
-                    importance = min(1.0, max(0.1, base_importance))
-                    emotion = min(1.0, max(0.1, base_emotion))
-                    
-                    memory = self.memory_system.add_memory(learning.strip(), emotion, importance, "conversation")
-                    stored_memories.append(memory)
-                    
-                    # Evolve personality based on new memory
-                    self.personality_system.evolve_personality_from_memory(memory)
-            
             if stored_memories:
                 return stored_memories
                 
+        except CircuitOpenError:
+            pass  # Model server known to be down; go straight to the fallback
         except Exception as e:
             # AI-based learning failed, use fallback method
             print(f"🔧 Learning system offline, using direct memory storage...")
@@ -598,6 +1205,34 @@ Return only simple statements, one per line, no explanations."""
         else:
             self.development_stage = 3  # Mature personality
     
+    def build_system_prompt(self, memory_context):
+        """System prompt, most stable fragments first so the model server can reuse its cache
+        
+        Personality is cached by the personality system, the development fragment until
+        the stage changes and the time fragment for the current minute.
+        """
+        development_modifier = self._cached_fragment("development", self.development_stage,
+                                                     self.get_development_prompt_modifier)
+        time_context = self._cached_fragment("time", self._time_prompt_key(), self.get_time_context_prompt)
+        
+        return (self.personality_system.personality_prompt_fragment() + development_modifier
+                + self.personality_system.memory_awareness_prompt(memory_context) + time_context)
+    
+    def _cached_fragment(self, name, key, build):
+        """Fragment text from the cache, rebuilt only when its key changes"""
+        cached = self.prompt_fragments.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, build())
+            self.prompt_fragments[name] = cached
+        return cached[1]
+    
+    def _time_prompt_key(self):
+        """Everything the time fragment depends on, at minute granularity"""
+        time_system = self.time_system
+        return (datetime.now().strftime("%Y-%m-%d %H:%M"), time_system.operational_mode,
+                time_system.last_wake_time, time_system.last_sleep_time, time_system.sleep_debt,
+                time_system.consciousness_start_time)
+    
     def get_development_prompt_modifier(self):
         """Get development stage specific prompt modifications"""
         if self.development_stage == 0:
@@ -667,8 +1302,8 @@ React naturally to the time context. If you were just woken up, you might be gro
 
 # Terminal Interface
 class TerminalInterface:
-    def __init__(self):
-        self.ai = AkiraConsciousness()
+    def __init__(self, backend=None):
+        self.ai = AkiraConsciousness(backend=backend)
         self.running = True
         
     def clear_screen(self):
@@ -685,8 +1320,9 @@ class TerminalInterface:
         
         print(f"Current time: {time_context['current_time']} | Mode: {mode_icon} {time_context['operational_mode'].title()}")
         
-        stats = self.ai.memory_system.get_stats()
-        personality_stats = self.ai.personality_system.get_personality_stats()
+        with self.ai.memory_system.lock:
+            stats = self.ai.memory_system.get_stats()
+            personality_stats = self.ai.personality_system.get_personality_stats()
         dominant = personality_stats["dominant_personality"]
         
         print(f"Memories: {stats['total']} | Clear: {stats['strong']} | Fading: {stats['weak']} | Days: {stats['days']}")
@@ -705,14 +1341,17 @@ class TerminalInterface:
         print("  /help     - Show this help")
         print("  /stats    - Show detailed memory statistics")
         print("  /memories - List all memories")
-        print("  /day      - Advance one day (time passes)")
+        print("  /memories <context> - List memories from one context")
+        print("  /day [N]  - Advance one day, or fast-forward N days (time passes)")
         print("  /sleep    - Put Akira to sleep")
         print("  /wake     - Wake Akira up (if sleeping)")
         print("  /ghost    - Enter ghost mode (unconscious for development)")
         print("  /status   - Show current operational mode and time status")
         print("  /snapshot - Create detailed memory snapshot")
-        print("  /report   - Generate comprehensive memory report")
+        print("  /report [--since] - Generate comprehensive memory report (--since: only new events)")
+        print("  /log query [hash=H] [type=T] [since=MS] [until=MS] [limit=N] - Search the activity log")
         print("  /personality - Show Akira's current personality")
+        print("  /structured - Toggle single-call replies (reply and learnings together)")
         print("  /fix_memory - Create essential memories (for testing/recovery)")
         print("  /clear    - Clear screen")
         print("  /quit     - Exit the program")
@@ -725,7 +1364,9 @@ class TerminalInterface:
         print("  👻 Ghost  - Unconscious mode for development/testing")
     
     def show_stats(self):
-        stats = self.ai.memory_system.get_stats()
+        with self.ai.memory_system.lock:
+            stats = self.ai.memory_system.get_stats()
+            histogram = self.ai.memory_system.strength_stats.histogram_buckets()
         print(f"\n📊 Memory Statistics:")
         print(f"  Total Memories: {stats['total']}")
         print(f"  Average Strength: {stats['avg_strength']:.2f}")
@@ -733,23 +1374,41 @@ class TerminalInterface:
         print(f"  Weak Memories (<0.3): {stats['weak']}")
         print(f"  Days Lived: {stats['days']}")
         print(f"  Sleep Cycles: {stats['sleep_cycles']}")
+        
+        if stats['total']:
+            print(f"\n📈 Strength Distribution:")
+            for bucket, count in histogram.items():
+                bar = "█" * round(20 * count / stats['total'])
+                print(f"  {bucket} {bar} {count}")
     
-    def show_memories(self):
-        memories = self.ai.memory_system.memories
-        if not memories:
-            print("\n🧠 No memories yet!")
-            return
+    def show_memories(self, context=None):
+        memory_system = self.ai.memory_system
+        with memory_system.lock:
+            memories = memory_system.memories_in_context(context) if context is not None else memory_system.memories
+            rows = [(mem.content, mem.get_total_strength(), mem.context, mem.access_count) for mem in memories]
+            available = ", ".join(memory_system.context_index.contexts()) or "none yet"
+        
+        if context is not None:
+            if not rows:
+                print(f"\n🧠 No memories about '{context}'. Contexts: {available}")
+                return
+            print(f"\n🧠 Memories about '{context}' ({len(rows)}):")
+        else:
+            if not rows:
+                print("\n🧠 No memories yet!")
+                return
+            print(f"\n🧠 All Memories ({len(rows)}):")
         
-        print(f"\n🧠 All Memories ({len(memories)}):")
-        for i, mem in enumerate(memories, 1):
-            strength = mem.get_total_strength()
+        for i, (content, strength, memory_context, access_count) in enumerate(rows, 1):
             strength_desc = "💪" if strength > 0.7 else "🤔" if strength > 0.4 else "💭"
-            print(f"  {i}. {strength_desc} {mem.content[:60]}{'...' if len(mem.content) > 60 else ''}")
-            print(f"      Strength: {strength:.2f} | Context: {mem.context} | Accessed: {mem.access_count} times")
+            print(f"  {i}. {strength_desc} {content[:60]}{'...' if len(content) > 60 else ''}")
+            print(f"      Strength: {strength:.2f} | Context: {memory_context} | Accessed: {access_count} times")
     
     def show_personality(self):
         """Show Akira's current personality traits"""
-        personality_stats = self.ai.personality_system.get_personality_stats()
+        with self.ai.memory_system.lock:
+            personality_stats = self.ai.personality_system.get_personality_stats()
+            personality_changes = self.ai.personality_system.analyze_personality_changes()
         dominant = personality_stats["dominant_personality"]
         
         print(f"\n🎭 {personality_stats['name']}'s Current Personality:")
@@ -772,7 +1431,7 @@ class TerminalInterface:
         
         print(f"\n📈 Personality Evolution:")
         print(f"  Personality has changed {personality_stats['personality_evolution_count']} times")
-        print(f"  {self.ai.personality_system.analyze_personality_changes()}")
+        print(f"  {personality_changes}")
     
     def show_status(self):
         """Show current operational mode and time status"""
@@ -805,10 +1464,98 @@ class TerminalInterface:
         
         elif time_context['operational_mode'] == 'ghost':
             print(f"  👻 Unconscious - unaware of surroundings or conversations")
+        
+        self.show_models()
+        
+        log_stats = self.ai.logger.stats()
+        if log_stats["mode"] == "buffered":
+            print(f"\n📝 Log: {log_stats['written']}/{log_stats['queued']} events written, "
+                  f"{log_stats['waiting']} waiting, {log_stats['dropped']} dropped ({log_stats['backpressure']})")
+        else:
+            print(f"\n📝 Log: written directly to {self.ai.logger.log_file}")
+        segments = f" + {log_stats['segments']} closed segments" if log_stats["segments"] else ""
+        print(f"  {log_stats['events']} events on disk in {self.ai.logger.log_file}{segments} "
+              f"({log_stats['disk_bytes'] / 1024:.0f} KB)")
+    
+    def query_log(self, arguments):
+        """/log query: events about a memory, of one type or in a time range
+        
+        since/until are epoch milliseconds; negative values count back from now.
+        """
+        if not arguments or arguments[0] != "query":
+            print("❓ Usage: /log query [hash=H] [type=T] [since=MS] [until=MS] [limit=N]")
+            return
+        
+        filters = {"memory_hash": None, "event_type": None, "since_ms": None, "until_ms": None, "limit": 20}
+        names = {"hash": "memory_hash", "type": "event_type", "since": "since_ms", "until": "until_ms", "limit": "limit"}
+        now_ms = int(time.time() * 1000)
+        for argument in arguments[1:]:
+            name, _, value = argument.partition("=")
+            if name not in names or not value:
+                print(f"❓ Unknown filter: {argument}")
+                return
+            if name in ("since", "until", "limit"):
+                try:
+                    value = int(value)
+                except ValueError:
+                    print(f"❓ {name} needs a whole number: {value}")
+                    return
+                if name != "limit" and value < 0:
+                    value = now_ms + value
+            filters[names[name]] = value
+        
+        events = self.ai.logger.query(**filters)
+        if not events:
+            print("🔎 No matching log events")
+            return
+        
+        print(f"\n🔎 {len(events)} most recent matching events:")
+        for event in events:
+            when = event.get("timestamp") or event.get("birth_time", "")
+            kind = event.get("event_type") or event.get("category")
+            detail = (event.get("memory_details", {}).get("content") or event.get("query")
+                      or event.get("user_input") or "")
+            hashes = memory_hashes(event)
+            line = f"  {when[:23]} {kind}"
+            if hashes:
+                line += f" [{', '.join(hashes[:3])}{', ...' if len(hashes) > 3 else ''}]"
+            if detail:
+                line += f" {detail[:50]}"
+            print(line)
+    
+    def show_models(self):
+        """Show which model serves each task and how long calls have taken"""
+        router = self.ai.models
+        latency = router.latency_summary()
+        
+        print(f"\n🤖 Models (keep_alive {router.keep_alive}):")
+        for task, model in router.models.items():
+            stats = latency.get(task)
+            line = f"  {task.title()}: {model}"
+            if stats:
+                line += f" | {stats['calls']} calls, avg {stats['avg_seconds']:.2f}s, last {stats['last_seconds']:.2f}s"
+                if "avg_first_token_seconds" in stats:
+                    line += f", first token {stats['avg_first_token_seconds']:.2f}s"
+            if model in router.preload_seconds:
+                line += f" | preloaded in {router.preload_seconds[model]:.1f}s"
+            print(line)
+        
+        breaker = router.breaker.status()
+        line = (f"  Circuit: {breaker['state']} | {breaker['consecutive_failures']}/{breaker['failure_threshold']} "
+                f"failures, tripped {breaker['trips']}x")
+        if breaker["state"] == "open":
+            line += f" | retrying in {breaker['retry_in_seconds']:.0f}s"
+        if breaker["last_error"]:
+            ago = time.time() - breaker["last_failure_time"]
+            line += f" | last error {ago:.0f}s ago: {breaker['last_error'][:60]}"
+        print(line)
+        print(f"  Deadlines: " + ", ".join(f"{task} {seconds:.0f}s" for task, seconds in router.deadlines.items())
+              + f" | {router.max_retries} retries")
     
     def show_comprehensive_monitor(self):
         """Beautiful comprehensive emotional and personality monitor"""
-        status = self.ai.comprehensive_monitor.get_complete_status()
+        with self.ai.memory_system.lock:
+            status = self.ai.comprehensive_monitor.get_complete_status()
         
         # Clear screen and create beautiful header
         self.clear_screen()
@@ -955,38 +1702,43 @@ class TerminalInterface:
                     self.show_comprehensive_monitor()
                     continue
                 
-                # Handle regular commands
+                # Handle regular commands (each takes the memory lock only while it reads or
+                # changes state the learning worker also touches)
                 if user_input.startswith('/'):
                     self.handle_command(user_input)
                     continue
                 
-                # Chat with Akira
+                # Chat with Akira, printing the reply as it is generated
+                chunks, recalled_memories = self.ai.stream_chat_with_memory(user_input)
+                if self.ai.learning_worker.take_learned_count():
+                    print(f"🧠 (Something new to remember from the last conversation)")
                 print("\n💭 Akira: ", end="", flush=True)
-                ai_response, recalled_memories = self.ai.chat_with_memory(user_input)
                 
-                # Type out response with typing effect
-                for char in ai_response:
-                    print(char, end="", flush=True)
-                    time.sleep(0.02)  # Typing effect
+                pieces = []
+                for piece in chunks:
+                    print(piece, end="", flush=True)
+                    pieces.append(piece)
+                ai_response = "".join(pieces)
                 
                 # Show what memories were recalled
                 if recalled_memories:
                     print(f"\n\n💭 (This brought back {len(recalled_memories)} memories)")
                 
-                # Learn from conversation
-                learned_memories = self.ai.learn_from_conversation(user_input, ai_response)
-                if learned_memories:
-                    print(f"🧠 (Something new to remember from this conversation)")
-                
-                # Log the complete conversation with memory context
-                memory_stats = self.ai.memory_system.get_stats()
-                self.ai.logger.log_conversation(user_input, ai_response, recalled_memories, learned_memories, memory_stats)
+                # Learn from and log the conversation in the background
+                self.ai.learning_worker.submit(user_input, ai_response, recalled_memories,
+                                               self.ai.take_reply_learnings())
                 
             except KeyboardInterrupt:
                 print("\n\n👋 Goodbye!")
                 break
             except Exception as e:
                 print(f"\n❌ Error: {e}")
+        
+        # Let queued learning finish before exiting
+        if self.ai.learning_worker.pending:
+            print("🧠 Finishing up memories from this conversation...")
+        self.ai.learning_worker.shutdown()
+        self.ai.logger.close()
     
     def handle_command(self, command):
         cmd = command.lower()
@@ -997,9 +1749,22 @@ class TerminalInterface:
             self.show_stats()
         elif cmd == '/memories':
             self.show_memories()
+        elif cmd.startswith('/memories '):
+            self.show_memories(command.split(maxsplit=1)[1].strip())
         elif cmd == '/day':
             self.ai.memory_system.advance_day()
             print(f"⏰ Day {self.ai.memory_system.days} - Another day passes, thoughts and memories shift...")
+        elif cmd.startswith('/day '):
+            try:
+                days = int(cmd.split()[1])
+            except ValueError:
+                print("❓ Usage: /day N (number of days to pass)")
+                return
+            if days < 1:
+                print("❓ Usage: /day N (number of days to pass)")
+                return
+            self.ai.memory_system.advance_days(days)
+            print(f"⏰ Day {self.ai.memory_system.days} - {days} days pass, thoughts and memories shift...")
         elif cmd == '/sleep':
             if self.ai.time_system.operational_mode == "awake":
                 self.ai.time_system.enter_sleep_mode()
@@ -1027,19 +1792,27 @@ class TerminalInterface:
         elif cmd == '/status':
             self.show_status()
         elif cmd == '/snapshot':
-            self.ai.logger.create_memory_snapshot(self.ai.memory_system)
-            print("📸 Memory snapshot created in akira_memories.json")
-        elif cmd == '/report':
-            report_file = self.ai.logger.generate_summary_report()
+            with self.ai.memory_system.lock:
+                self.ai.logger.create_memory_snapshot(self.ai.memory_system)
+            print(f"📸 Memory snapshot created in {self.ai.logger.log_file}")
+        elif cmd in ('/report', '/report --since'):
+            # --since reads only what was logged after the last report and merges it in
+            report_file = self.ai.logger.generate_summary_report(since_checkpoint=cmd.endswith('--since'))
             if report_file:
                 print(f"📊 Comprehensive memory report generated: {report_file}")
             else:
                 print("❌ Failed to generate report")
+        elif cmd == '/log' or cmd.startswith('/log '):
+            self.query_log(command.split()[1:])
         elif cmd == '/personality':
             self.show_personality()
         elif cmd == '/clear':
             self.clear_screen()
             self.print_header()
+        elif cmd == '/structured':
+            self.ai.structured_replies = not self.ai.structured_replies
+            state = "on" if self.ai.structured_replies else "off"
+            print(f"🧩 Single-call replies {state} (falls back to two calls if a reply can't be parsed)")
         elif cmd == '/quit':
             self.running = False
             print("👋 Goodbye!")
@@ -1066,19 +1839,26 @@ if __name__ == "__main__":
     print("🧬 Initializing consciousness simulation...")
     print("   Make sure Ollama is running with llama3 model!")
     
+    # SIGTERM exits like Ctrl+C, so queued learning and log events are written first
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    
     try:
-        # Test Ollama connection
-        test_response = ollama.chat(model='llama3', messages=[
-            {"role": "user", "content": "Hello, just testing connection."}
-        ])
+        # --stub swaps Ollama for a deterministic stand-in model (no server needed)
+        backend = StubBackend(latency=0.05, tokens_per_second=40) if "--stub" in sys.argv else None
+        interface = TerminalInterface(backend)
+        
+        # Cheap liveness probe instead of a full test completion
+        missing_models = interface.ai.models.check_connection()
         print("✅ Neural pathways connected!")
+        for model in missing_models:
+            print(f"⚠️ Model {model} isn't available yet - run: ollama pull {model}")
         print("📝 Advanced monitoring systems active - tracking memory, emotion & personality")
         print("🕒 Time awareness system initialized - Akira knows when he's being woken up!")
         print("🔬 Use 'emt/prt.00_Akira' to access psychological monitoring")
         print("⚙️  Three operational modes available: 👁️ Awake, 😴 Sleep, 👻 Ghost")
         
-        # Start the terminal interface
-        interface = TerminalInterface()
+        # Start the terminal interface right away, loading the routed models in the background
+        interface.ai.models.preload(("reply", "learning", "summary"))
         interface.run()
         
     except Exception as e:
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Akira LLM Backends
+The interface AkiraConsciousness talks to models through, an Ollama
+implementation, and a deterministic stand-in (in-process, or served over
+the Ollama HTTP API) for benchmarking the pipeline without a real model
+Run a stand-in server: python akira_backends.py [port] [latency] [tokens_per_second]
+"""
+
+import json
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import ollama
+
+class LLMBackend(ABC):
+    """What the rest of Akira needs from a model server"""
+
+    @abstractmethod
+    def chat(self, model, messages, stream=False, format=None, keep_alive=None, timeout=None):
+        """{"message": {"content": ...}} response, or an iterator of such chunks when streaming
+
+        timeout bounds how long the call may wait on the server, in seconds.
+        """
+
+    def is_transient(self, error):
+        """Whether an error means the server is slow or down (worth retrying) rather than a bad request"""
+        return isinstance(error, (ConnectionError, TimeoutError))
+
+    @abstractmethod
+    def list_models(self):
+        """Names of the models available locally (doubles as a liveness probe)"""
+
+    def load(self, model, keep_alive=None):
+        """Load a model ahead of use and keep it resident"""
+
+class OllamaBackend(LLMBackend):
+    def __init__(self, host=None, connect_timeout=5.0, request_timeout=120.0):
+        # One client for every call; its HTTP connection pool keeps connections alive.
+        # Per-call deadlines are applied to each request by a hook, not by separate clients
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+        self.call_timeout = threading.local()  # Deadline of the call in progress on this thread
+        self.client = ollama.Client(host=host, timeout=httpx.Timeout(request_timeout, connect=connect_timeout),
+                                    event_hooks={"request": [self._apply_call_timeout]})
+
+    def _apply_call_timeout(self, request):
+        timeout = getattr(self.call_timeout, "seconds", None)
+        if timeout is not None:
+            request.extensions["timeout"] = httpx.Timeout(timeout, connect=min(self.connect_timeout, timeout)).as_dict()
+
+    def chat(self, model, messages, stream=False, format=None, keep_alive=None, timeout=None):
+        options = {"format": format} if format else {}
+        if timeout is not None:
+            timeout = min(timeout, self.request_timeout)
+        if stream:
+            # Ollama sends a streamed request on the first next(), so set the deadline then
+            return self._stream_with_timeout(model, messages, keep_alive, timeout, options)
+
+        self.call_timeout.seconds = timeout
+        try:
+            return self.client.chat(model=model, messages=messages, stream=False, keep_alive=keep_alive, **options)
+        finally:
+            self.call_timeout.seconds = None
+
+    def _stream_with_timeout(self, model, messages, keep_alive, timeout, options):
+        self.call_timeout.seconds = timeout
+        try:
+            chunks = self.client.chat(model=model, messages=messages, stream=True, keep_alive=keep_alive, **options)
+            first_chunk = next(chunks, None)  # The request goes out here
+        finally:
+            self.call_timeout.seconds = None
+        if first_chunk is not None:
+            yield first_chunk
+            yield from chunks
+
+    def is_transient(self, error):
+        if isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError)):
+            return True
+        return isinstance(error, ollama.ResponseError) and error.status_code >= 500
+
+    def list_models(self):
+        names = []
+        for model in self.client.list()["models"]:
+            name = model.get("model") or model.get("name")
+            if name:
+                names.append(name)
+        return names
+
+    def load(self, model, keep_alive=None):
+        # An empty prompt just loads the model
+        self.client.generate(model=model, prompt="", keep_alive=keep_alive)
+
+class StubBackend(LLMBackend):
+    """Deterministic stand-in model with configurable latency and token rate
+
+    Replies cycle through responses if given, otherwise fill template from
+    {model}, {call} and {last_user} (the start of the last user message).
+    JSON-format calls get a structured reply with one learning.
+    """
+
+    def __init__(self, responses=None, template="I hear you. You said: {last_user}", latency=0.0,
+                 tokens_per_second=None, models=("llama3:latest", "llama3.2:1b")):
+        self.available = True  # Set False to simulate the server being down
+        self.responses = list(responses or [])
+        self.template = template
+        self.latency = latency  # Seconds before the first token
+        self.tokens_per_second = tokens_per_second  # None generates instantly
+        self.models = list(models)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def reply_text(self, model, messages):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        if self.responses:
+            return self.responses[(call - 1) % len(self.responses)]
+
+        last_user = next((message["content"] for message in reversed(messages) if message["role"] == "user"), "")
+        return self.template.format(model=model, call=call, last_user=" ".join(last_user.split()[:12]))
+
+    def _tokens(self, text):
+        """Word-sized chunks, the unit of the simulated token rate"""
+        words = text.split(" ")
+        return [word + " " for word in words[:-1]] + [words[-1]]
+
+    def chat(self, model, messages, stream=False, format=None, keep_alive=None, timeout=None):
+        if not self.available:
+            raise ConnectionError("stand-in model server is down")
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"no reply within {timeout:.1f}s")
+
+        text = self.reply_text(model, messages)
+        if format == "json":
+            text = json.dumps({"reply": text, "remember": [f"I told someone: {text}"]})
+
+        if stream:
+            return self._stream(model, text)
+
+        self._wait(len(self._tokens(text)))
+        return {"model": model, "message": {"role": "assistant", "content": text}, "done": True}
+
+    def _stream(self, model, text):
+        if self.latency:
+            time.sleep(self.latency)
+        for token in self._tokens(text):
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            yield {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+        yield {"model": model, "message": {"role": "assistant", "content": ""}, "done": True}
+
+    def _wait(self, token_count):
+        delay = self.latency + (token_count / self.tokens_per_second if self.tokens_per_second else 0)
+        if delay:
+            time.sleep(delay)
+
+    def list_models(self):
+        return list(self.models)
+
+    def load(self, model, keep_alive=None):
+        self._wait(0)
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """The slice of the Ollama HTTP API Akira uses, answered by the server's StubBackend"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Small streamed writes would otherwise wait on delayed ACKs
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up (e.g. its deadline passed)
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        backend = self.server.backend
+        if self.path == "/api/tags":
+            now = datetime.now(timezone.utc).isoformat()
+            self._send_json({"models": [{"name": name, "model": name, "modified_at": now, "size": 0, "digest": ""}
+                                        for name in backend.list_models()]})
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-akira-stub"})
+        else:
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_POST(self):
+        backend = self.server.backend
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        created_at = datetime.now(timezone.utc).isoformat()
+        model = request.get("model", "")
+
+        if self.path == "/api/generate":
+            backend.load(model)
+            self._send_json({"model": model, "created_at": created_at, "response": "", "done": True})
+            return
+        if self.path != "/api/chat":
+            self._send_json({"error": f"unknown endpoint {self.path}"}, 404)
+            return
+
+        messages = request.get("messages", [])
+        fmt = request.get("format")
+        if not request.get("stream", True):
+            response = backend.chat(model, messages, format=fmt)
+            self._send_json({**response, "created_at": created_at, "done_reason": "stop"})
+            return
+
+        # Streamed as newline-delimited JSON, like Ollama
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in backend.chat(model, messages, stream=True, format=fmt):
+            line = json.dumps({**chunk, "created_at": created_at}).encode() + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+def serve_stub(backend=None, host="127.0.0.1", port=11435):
+    """Start a stand-in Ollama server on a background thread; returns the server (call shutdown() to stop)"""
+    server = ThreadingHTTPServer((host, port), StubRequestHandler)
+    server.daemon_threads = True
+    server.backend = backend or StubBackend()
+    threading.Thread(target=server.serve_forever, name="akira-stub-server", daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 11435
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    tokens_per_second = float(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    server = serve_stub(StubBackend(latency=latency, tokens_per_second=tokens_per_second), port=port)
+    print(f"🧪 Stand-in Ollama server on http://127.0.0.1:{port} (latency {latency}s, "
+          f"{tokens_per_second or 'unlimited'} tokens/s) - Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Akira Benchmarks
+Timing and accuracy checks for the memory system's fast paths
+Run: python akira_benchmark.py [memory_count]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from Akira import AkiraConsciousness, AkiraMemorySystem
+from akira_backends import OllamaBackend, StubBackend, serve_stub
+from akira_persistence import AkiraPersistenceSystem
+
+def generate_memory_texts(count, seed=7):
+    """Memory-like sentences in clusters of near-duplicates"""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(max(200, count))]
+    texts = []
+    while len(texts) < count:
+        theme = rng.sample(vocabulary, 10)
+        for _ in range(rng.randint(1, 5)):
+            variant = [word if rng.random() < 0.7 else rng.choice(vocabulary) for word in theme]
+            texts.append(" ".join(variant))
+    return texts[:count]
+
+def generate_conversation_texts(count, seed=13):
+    """Memories in the app's "Someone said to me: ..." form, so token overlap is high (~85 neighbours each at 300)"""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(60)]
+    return [f"Someone said to me: I {' '.join(rng.sample(vocabulary, 8))}" for _ in range(count)]
+
+def build_memory_system(texts, **options):
+    """Memory system filled with texts, without logging"""
+    rng = random.Random(11)
+    memory_system = AkiraMemorySystem(**options)
+    for text in texts:
+        memory_system.add_memory(text, rng.random(), rng.random())
+    return memory_system
+
+def similar_pairs(memory_system, threshold):
+    """All (memory_id, memory_id) -> similarity pairs above threshold"""
+    pairs = {}
+    for memory in memory_system.memories:
+        for other_memory, similarity in memory_system.find_similar_memories(memory, threshold):
+            pairs[(memory.memory_id, other_memory.memory_id)] = similarity
+    return pairs
+
+def benchmark_similarity(count=1000, min_recall=0.95):
+    """Compare LSH similarity search (exact verification, the only mode) with the brute-force scan"""
+    texts = generate_memory_texts(count)
+    brute_force = build_memory_system(texts, use_lsh=False)
+    lsh = build_memory_system(texts)
+
+    print(f"\n🔍 Similarity search over {count} memories")
+    for threshold in (0.3, 0.4):
+        start = time.perf_counter()
+        expected = similar_pairs(brute_force, threshold)
+        brute_force_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = similar_pairs(lsh, threshold)
+        lsh_time = time.perf_counter() - start
+
+        shared = expected.keys() & found.keys()
+        recall = len(shared) / max(1, len(expected))
+        precision = len(shared) / max(1, len(found))
+        max_error = max((abs(expected[pair] - found[pair]) for pair in shared), default=0)
+
+        print(f"  Jaccard > {threshold}: {len(expected)} pairs | recall {recall:.3f} | precision {precision:.3f} | max similarity error {max_error:.3f}")
+        print(f"    brute force {brute_force_time:.3f}s | LSH {lsh_time:.3f}s ({brute_force_time / max(lsh_time, 1e-9):.1f}x)")
+        print(f"    {'✅ within' if recall >= min_recall else '⚠️ outside'} tolerance (recall >= {min_recall})")
+
+    return recall, precision
+
+def check_persistence_round_trip(count=200):
+    """Save and restore a memory system; restored strengths and stats must match the saved ones"""
+    texts = generate_memory_texts(count, seed=5)
+    persistence = AkiraPersistenceSystem()
+    print(f"\n💾 Save/restore round trip over {count} memories")
+    for backend in ("objects", "numpy"):
+        memory_system = build_memory_system(texts, backend=backend)
+        for _ in range(3):
+            memory_system.advance_day()
+        for memory in memory_system.memories:
+            memory.volatility_factor = 0.0  # No daily fluctuation, so strengths are exact
+            memory.invalidate_strength()
+        weak_memory = memory_system.memories[0]
+        weak_memory.base_strength = 0.01
+        weak_memory.invalidate_strength()
+        expected = [memory.get_total_strength() for memory in memory_system.memories]
+
+        data = json.loads(json.dumps(persistence._serialize_memory_system(memory_system), default=str))
+        restored = AkiraMemorySystem(backend=backend)
+        persistence._restore_memory_system(restored, data)
+
+        # Read the aggregates before anything re-evaluates the restored memories
+        stats = restored.get_stats()
+        strengths = [memory.get_total_strength() for memory in restored.memories]
+        assert max(abs(a - b) for a, b in zip(expected, strengths)) < 1e-6, "restored strengths differ"
+        assert abs(stats["avg_strength"] - sum(expected) / len(expected)) < 1e-6, "restored stats differ"
+        assert stats["total"] == count and stats["weak"] == memory_system.get_stats()["weak"]
+        print(f"  {backend:<8} ✅ strengths and stats match (weak memory {strengths[0]:.3f})")
+
+def benchmark_day_advance(count=1000, days=3):
+    """Time advance_day across backends"""
+    texts = generate_memory_texts(count)
+    print(f"\n⏰ advance_day x{days} over {count} memories")
+    for options in ({"backend": "objects"}, {"backend": "numpy"}):
+        memory_system = build_memory_system(texts, **options)
+        start = time.perf_counter()
+        for _ in range(days):
+            memory_system.advance_day()
+        print(f"  {options['backend']:<8} {(time.perf_counter() - start) / days * 1000:.1f} ms/day")
+
+def benchmark_fast_forward(count=300, days=365, daily_ticks=30):
+    """Time advance_days against single day ticks over memories with high token overlap"""
+    texts = generate_conversation_texts(count)
+    print(f"\n⏩ advance_days({days}) vs {daily_ticks} advance_day calls over {count} overlapping memories")
+    for options in ({"backend": "objects"}, {"backend": "numpy"}, {"backend": "objects", "decay_mode": "lazy"}):
+        memory_system = build_memory_system(texts, **options)
+        start = time.perf_counter()
+        memory_system.advance_days(days)
+        fast_forward_time = time.perf_counter() - start
+
+        memory_system = build_memory_system(texts, **options)
+        start = time.perf_counter()
+        for _ in range(daily_ticks):
+            memory_system.advance_day()
+        daily_time = time.perf_counter() - start
+
+        label = "/".join(options.values())
+        print(f"  {label:<13} advance_days {fast_forward_time:.2f}s | {daily_ticks} x advance_day {daily_time:.2f}s")
+
+def run_turns(backend, turns):
+    """Chat turns per second through the full pipeline, including background learning
+
+    Runs in a scratch directory so the memory log and conversation archive start empty.
+    """
+    texts = generate_memory_texts(turns, seed=3)
+    original_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            ai = AkiraConsciousness(backend=backend)
+            start = time.perf_counter()
+            for text in texts:
+                chunks, recalled_memories = ai.stream_chat_with_memory(text)
+                ai_response = "".join(chunks)
+                ai.learning_worker.submit(text, ai_response, recalled_memories, ai.take_reply_learnings())
+            ai.learning_worker.shutdown()
+            ai.logger.close()
+            return turns / (time.perf_counter() - start)
+        finally:
+            os.chdir(original_directory)
+
+def benchmark_turns(turns=200):
+    """Pipeline overhead (memory, logging, learning) against stand-in models"""
+    print(f"\n💬 {turns} chat turns against a stand-in model")
+    print(f"  in-process stub  {run_turns(StubBackend(), turns):.0f} turns/s")
+
+    server = serve_stub(StubBackend(), port=0)
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"  HTTP stub server {run_turns(OllamaBackend(host), turns):.0f} turns/s")
+    server.shutdown()
+
+if __name__ == "__main__":
+    memory_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    check_persistence_round_trip()
+    benchmark_similarity(memory_count)
+    benchmark_day_advance(memory_count)
+    benchmark_fast_forward()
+    benchmark_turns()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Akira Conversation Window
+Keeps the last few turns as chat messages, folds older turns into a rolling
+summary and spills them to an on-disk archive, so prompts and saves stay bounded
+"""
+
+import json
+
+class ConversationWindow:
+    def __init__(self, memory_system, window_turns=6, summary_batch=2, max_summary_failures=3,
+                 max_backlog=8, archive_file="akira_conversation_archive.jsonl"):
+        # Turns and the summary live on the memory system, which is what gets saved
+        self.memory_system = memory_system
+        self.window_turns = window_turns
+        self.summary_batch = summary_batch  # Evicted turns folded into the summary at once
+        self.archive_file = archive_file
+        self.summarizing = False
+
+        # When summarizing keeps failing, the oldest waiting turns are dropped
+        # (they are already archived) so prompts and saves stay bounded
+        self.max_summary_failures = max_summary_failures
+        self.max_backlog = max_backlog
+        self.summary_failures = 0
+
+    @property
+    def turns(self):
+        return self.memory_system.conversation_history
+
+    def add_turn(self, turn):
+        """Record a finished turn; True when enough older turns are waiting to be summarized"""
+        memory_system = self.memory_system
+        with memory_system.lock:
+            self.turns.append(turn)
+
+            evicted = []
+            while len(self.turns) > self.window_turns:
+                evicted.append(self.turns.pop(0))
+            if evicted:
+                self._archive(evicted)
+                memory_system.summary_backlog.extend(evicted)
+                overflow = len(memory_system.summary_backlog) - self.max_backlog
+                if overflow > 0:
+                    self._drop_backlog(overflow, "too many turns waiting for a summary")
+
+            return len(memory_system.summary_backlog) >= self.summary_batch and not self.summarizing
+
+    def _archive(self, turns):
+        """Append turns that left the window to the archive (one JSON object per line)"""
+        with open(self.archive_file, 'a', encoding='utf-8') as f:
+            for turn in turns:
+                f.write(json.dumps(turn, ensure_ascii=False) + "\n")
+
+    def _drop_backlog(self, count, reason):
+        """Drop the oldest turns waiting for a summary (call with the memory lock held)"""
+        del self.memory_system.summary_backlog[:count]
+        print(f"\n⚠️ Conversation summary skipped {count} older turns ({reason}); they remain in {self.archive_file}")
+
+    def messages(self):
+        """Summary and recent turns as chat messages, oldest first
+
+        The newest summary_batch turns waiting to be folded into the summary
+        are still sent as messages; older ones are only in the archive.
+        """
+        memory_system = self.memory_system
+        with memory_system.lock:
+            messages = []
+            if memory_system.conversation_summary:
+                messages.append({"role": "system",
+                                 "content": f"Earlier in this conversation: {memory_system.conversation_summary}"})
+            for turn in memory_system.summary_backlog[-self.summary_batch:] + self.turns:
+                messages.append({"role": "user", "content": turn["user"]})
+                messages.append({"role": "assistant", "content": turn["ai"]})
+            return messages
+
+    def update_summary(self, summarize):
+        """Fold the oldest waiting turns (up to summary_batch) into the summary with summarize(summary, turns)
+
+        The model call runs outside the memory lock. Turns stay queued if it
+        fails or returns nothing; after max_summary_failures failures in a row
+        they are dropped instead.
+        """
+        memory_system = self.memory_system
+        with memory_system.lock:
+            if self.summarizing or not memory_system.summary_backlog:
+                return
+            self.summarizing = True
+            summary = memory_system.conversation_summary
+            turns = memory_system.summary_backlog[:self.summary_batch]
+
+        new_summary = None
+        try:
+            new_summary = summarize(summary, turns)
+        except Exception as e:
+            error = e
+        else:
+            error = "empty summary"
+        finally:
+            with memory_system.lock:
+                self.summarizing = False
+
+        with memory_system.lock:
+            if new_summary:
+                memory_system.conversation_summary = new_summary
+                del memory_system.summary_backlog[:len(turns)]
+                self.summary_failures = 0
+                return
+
+            self.summary_failures += 1
+            if self.summary_failures >= self.max_summary_failures:
+                self.summary_failures = 0
+                self._drop_backlog(len(turns), f"summarizing failed {self.max_summary_failures} times: {error}")
+
+    def read_archive(self):
+        """Every archived turn, oldest first"""
+        try:
+            with open(self.archive_file, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
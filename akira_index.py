@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Akira Memory Index
+Token vocabulary shared by every memory (interned ids and term statistics),
+an inverted index used to find and rank memories without scanning them all,
+a MinHash/LSH index used to find similar memories without comparing every pair,
+a context index that keeps per-context membership and strength totals,
+and running strength statistics so stats never need a full scan
+"""
+
+import math
+import heapq
+import sys
+from array import array
+from collections import Counter
+import numpy as np
+
+def tokenize(text):
+    """Split text into the same tokens recall has always matched on"""
+    return text.lower().split()
+
+def sorted_overlap(ids_a, ids_b):
+    """Number of shared ids between two sorted, duplicate-free id arrays"""
+    shared = i = j = 0
+    len_a, len_b = len(ids_a), len(ids_b)
+    while i < len_a and j < len_b:
+        a, b = ids_a[i], ids_b[j]
+        if a == b:
+            shared += 1
+            i += 1
+            j += 1
+        elif a < b:
+            i += 1
+        else:
+            j += 1
+    return shared
+
+def jaccard_similarity(ids_a, ids_b):
+    """Jaccard similarity of two sorted, duplicate-free id arrays"""
+    shared = sorted_overlap(ids_a, ids_b)
+    union = len(ids_a) + len(ids_b) - shared
+    return shared / union if union else 0
+
+class Vocabulary:
+    def __init__(self, tokens=()):
+        # Interned token strings and their integer ids
+        self.token_ids = {}
+        self.tokens = []
+
+        # Term statistics: how many indexed memories contain each token
+        self.document_frequency = array('I')
+
+        for token in tokens:
+            self.intern(token)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def intern(self, token):
+        """Id for a token, adding it to the vocabulary if new"""
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = len(self.tokens)
+            token = sys.intern(token)
+            self.token_ids[token] = token_id
+            self.tokens.append(token)
+            self.document_frequency.append(0)
+        return token_id
+
+    def encode(self, text):
+        """Token ids for text, in order and with repeats, interning new tokens"""
+        return [self.intern(token) for token in tokenize(text)]
+
+    def lookup(self, text):
+        """Ids of the tokens in text that are already known (queries don't grow the vocabulary)"""
+        token_ids = self.token_ids
+        return [token_ids[token] for token in tokenize(text) if token in token_ids]
+
+    def decode(self, token_ids):
+        return [self.tokens[token_id] for token_id in token_ids]
+
+    def reset(self, tokens=()):
+        """Start over from a saved token list (document frequencies are rebuilt as memories are indexed)"""
+        self.__init__(tokens)
+
+    @staticmethod
+    def unique_sorted(token_ids):
+        """Compact sorted, duplicate-free id array, the form memories store"""
+        return array('I', sorted(set(token_ids)))
+
+class MemoryIndex:
+    def __init__(self, vocabulary, k1=1.2, b=0.75):
+        # BM25 tuning parameters
+        self.k1 = k1
+        self.b = b
+
+        # token id -> {memory_id: term frequency}; document frequencies live in the vocabulary
+        self.vocabulary = vocabulary
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, memory_id, token_ids):
+        """Add a memory's token ids (in order, with repeats) to the index"""
+        document_frequency = self.vocabulary.document_frequency
+        for token_id, count in Counter(token_ids).items():
+            self.postings.setdefault(token_id, {})[memory_id] = count
+            document_frequency[token_id] += 1
+
+        self.doc_lengths[memory_id] = len(token_ids)
+        self.total_length += len(token_ids)
+
+    def clear(self):
+        """Drop every indexed memory"""
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    def idf(self, token_id):
+        """BM25 inverse document frequency of a token"""
+        doc_freq = self.vocabulary.document_frequency[token_id]
+        total_docs = len(self.doc_lengths)
+        return math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query_token_ids, limit=None):
+        """Rank memories sharing at least one query token by BM25 score
+
+        Returns (memory_id, score, matched_token_count) tuples, best first.
+        """
+        if not self.doc_lengths:
+            return []
+
+        avg_length = self.total_length / len(self.doc_lengths) or 1
+        scores = {}
+        matches = {}
+
+        for token_id in set(query_token_ids):
+            posting = self.postings.get(token_id)
+            if not posting:
+                continue
+
+            idf = self.idf(token_id)
+            for memory_id, term_freq in posting.items():
+                length_norm = 1 - self.b + self.b * self.doc_lengths[memory_id] / avg_length
+                score = idf * term_freq * (self.k1 + 1) / (term_freq + self.k1 * length_norm)
+                scores[memory_id] = scores.get(memory_id, 0) + score
+                matches[memory_id] = matches.get(memory_id, 0) + 1
+
+        ranked = ((memory_id, score, matches[memory_id]) for memory_id, score in scores.items())
+        if limit is None:
+            return sorted(ranked, key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(limit, ranked, key=lambda item: item[1])
+
+class MinHashIndex:
+    def __init__(self, num_perm=64, rows_per_band=2, seed=1):
+        # 64 permutations in 32 bands of 2 rows find ~95% of pairs at Jaccard 0.3.
+        # Candidates are always verified with exact Jaccard: an estimate-only mode was
+        # dropped on purpose (recall 0.87 above 0.3, errors up to ~0.19)
+        if num_perm % rows_per_band:
+            raise ValueError("num_perm must be a multiple of rows_per_band")
+        self.num_perm = num_perm
+        self.rows_per_band = rows_per_band
+        self.num_bands = num_perm // rows_per_band
+
+        # Universal hash family (a * x + b) mod p standing in for permutations
+        rng = np.random.default_rng(seed)
+        self.prime = (1 << 31) - 1
+        self.hash_a = rng.integers(1, self.prime, num_perm, dtype=np.int64)
+        self.hash_b = rng.integers(0, self.prime, num_perm, dtype=np.int64)
+
+        self.signatures = {}
+        self.token_ids = {}
+        self.buckets = [{} for _ in range(self.num_bands)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def signature(self, token_ids):
+        """MinHash signature of a set of token ids"""
+        if not len(token_ids):
+            return np.full(self.num_perm, self.prime, dtype=np.int64)
+
+        ids = np.frombuffer(token_ids, dtype=np.uint32).astype(np.int64)
+        hashed = (np.outer(ids, self.hash_a) + self.hash_b) % self.prime
+        return hashed.min(axis=0)
+
+    def _band_keys(self, signature):
+        rows = self.rows_per_band
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.num_bands)]
+
+    def add(self, memory_id, token_ids):
+        """Compute and bucket the signature of a memory's sorted, unique token ids"""
+        signature = self.signature(token_ids)
+        self.signatures[memory_id] = signature
+        self.token_ids[memory_id] = token_ids
+
+        for band, key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(key, set()).add(memory_id)
+
+    def clear(self):
+        """Drop every signature"""
+        self.signatures = {}
+        self.token_ids = {}
+        self.buckets = [{} for _ in range(self.num_bands)]
+
+    def candidates(self, memory_id):
+        """Memories sharing at least one LSH bucket with memory_id"""
+        found = set()
+        for band, key in enumerate(self._band_keys(self.signatures[memory_id])):
+            found.update(self.buckets[band].get(key, ()))
+        found.discard(memory_id)
+        return found
+
+    def similarity(self, memory_a, memory_b):
+        """Exact Jaccard similarity; signatures only pick the candidates"""
+        return jaccard_similarity(self.token_ids[memory_a], self.token_ids[memory_b])
+
+    def similar(self, memory_id, threshold):
+        """(memory_id, similarity) pairs above threshold among LSH candidates"""
+        similar = []
+        for other_id in self.candidates(memory_id):
+            similarity = self.similarity(memory_id, other_id)
+            if similarity > threshold:
+                similar.append((other_id, similarity))
+        return similar
+
+class ContextIndex:
+    def __init__(self):
+        # context -> {memory_id: last known strength}, in insertion order
+        self.members = {}
+        self.strength_sums = {}
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, memory_id, context, strength):
+        """File a memory under its context"""
+        self.members.setdefault(context, {})[memory_id] = strength
+        self.strength_sums[context] = self.strength_sums.get(context, 0) + strength
+
+    def update_strength(self, memory_id, context, strength):
+        """Keep the context's running strength sum in step with one memory"""
+        members = self.members.get(context)
+        if members is None or memory_id not in members:
+            return
+
+        self.strength_sums[context] += strength - members[memory_id]
+        members[memory_id] = strength
+
+    def clear(self):
+        self.members = {}
+        self.strength_sums = {}
+
+    def count(self, context):
+        return len(self.members.get(context, ()))
+
+    def memory_ids(self, context):
+        return list(self.members.get(context, ()))
+
+    def contexts(self):
+        return list(self.members)
+
+    def random_context(self, rng):
+        """A context picked in proportion to how many memories it holds"""
+        if not self.members:
+            return None
+        contexts = list(self.members)
+        return rng.choices(contexts, weights=[len(self.members[context]) for context in contexts])[0]
+
+    def stats(self):
+        """Count and average strength per context"""
+        return {
+            context: {
+                "count": len(members),
+                "avg_strength": round(self.strength_sums[context] / len(members), 3)
+            } for context, members in self.members.items()
+        }
+
+class StrengthStatistics:
+    def __init__(self, bucket_count=10):
+        # Fixed-width histogram over the 0.0-1.0 strength range
+        self.bucket_count = bucket_count
+        self.histogram = [0] * bucket_count
+        self.total = 0
+        self.strength_sum = 0.0
+        self.strong = 0  # > 0.7
+        self.weak = 0    # < 0.3
+        self.active = 0  # > 0.3
+
+    def _count(self, strength, direction):
+        self.total += direction
+        self.strength_sum += direction * strength
+        self.histogram[min(int(strength * self.bucket_count), self.bucket_count - 1)] += direction
+        if strength > 0.7:
+            self.strong += direction
+        if strength < 0.3:
+            self.weak += direction
+        if strength > 0.3:
+            self.active += direction
+
+    def add(self, strength):
+        self._count(strength, 1)
+
+    def update(self, old_strength, new_strength):
+        """Move one memory from its old strength to its new one"""
+        self._count(old_strength, -1)
+        self._count(new_strength, 1)
+
+    def clear(self):
+        self.__init__(self.bucket_count)
+
+    @property
+    def average(self):
+        return self.strength_sum / self.total if self.total else 0
+
+    def histogram_buckets(self):
+        """{"0.0-0.1": count, ...} for reports"""
+        width = 1 / self.bucket_count
+        return {f"{i * width:.1f}-{(i + 1) * width:.1f}": count for i, count in enumerate(self.histogram)}
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Akira Learning Worker
+Runs learning extraction, memory storage, personality evolution,
+conversation logging and other follow-up tasks in the background, after the
+reply has been shown
+"""
+
+import queue
+import threading
+
+class LearningWorker:
+    def __init__(self, consciousness, max_pending=8):
+        self.ai = consciousness
+        self.jobs = queue.Queue(maxsize=max_pending)  # Bounded: submit blocks when learning falls behind
+
+        # Conversations submitted but not yet fully learned and logged
+        self.pending = 0
+        self.idle = threading.Condition()
+
+        # Memories learned since the terminal last asked
+        self.learned_count = 0
+
+        self.thread = None
+        self.stopped = False
+
+    def start(self):
+        """Start the background thread (done automatically on first submit)"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="akira-learning", daemon=True)
+            self.thread.start()
+
+    def submit(self, user_input, ai_response, recalled_memories, learnings=None):
+        """Queue one finished exchange for learning and logging
+
+        learnings that came with the reply are stored as-is instead of extracted.
+        """
+        if self.stopped:
+            raise RuntimeError("Learning worker has been shut down")
+        self.start()
+
+        with self.idle:
+            self.pending += 1
+        self.jobs.put((user_input, ai_response, recalled_memories, learnings))
+
+    def submit_task(self, task):
+        """Queue a follow-up callable the next turn doesn't wait for
+
+        Never blocks (it may be called while holding the memory lock); returns
+        False if the queue is full, in which case the caller should retry later.
+        """
+        if self.stopped:
+            return False
+        self.start()
+        try:
+            self.jobs.put_nowait(task)
+        except queue.Full:
+            return False
+        return True
+
+    def wait_until_idle(self, timeout=None):
+        """Block until every queued exchange is learned; False if timeout ran out first"""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.pending == 0, timeout)
+
+    def take_learned_count(self):
+        """Memories learned since the last call"""
+        with self.idle:
+            count, self.learned_count = self.learned_count, 0
+        return count
+
+    def shutdown(self, timeout=None):
+        """Finish all queued work, then stop the thread"""
+        if self.stopped:
+            return
+        self.stopped = True
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+
+            if callable(job):
+                try:
+                    job()
+                except Exception as e:
+                    print(f"\n❌ Background task error: {e}")
+                continue
+
+            learned_memories = []
+            try:
+                learned_memories = self._learn(*job)
+            except Exception as e:
+                print(f"\n❌ Learning error: {e}")
+            finally:
+                with self.idle:
+                    self.pending -= 1
+                    self.learned_count += len(learned_memories)
+                    self.idle.notify_all()
+
+    def _learn(self, user_input, ai_response, recalled_memories, learnings):
+        learned_memories = self.ai.learn_from_conversation(user_input, ai_response, learnings)
+
+        # Log the complete conversation with memory context
+        memory_system = self.ai.memory_system
+        with memory_system.lock:
+            memory_stats = memory_system.get_stats()
+            self.ai.logger.log_conversation(user_input, ai_response, recalled_memories, learned_memories, memory_stats)
+
+        return learned_memories
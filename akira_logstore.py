@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Akira Log Storage
+Where the activity log lives: a segmented, rotating JSON-lines log (closed
+segments compressed, described in a manifest and removed by retention
+policy), or an indexed SQLite database for report and audit queries
+"""
+
+import gzip
+import json
+import lzma
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# compression name -> (opener, file suffix)
+COMPRESSORS = {
+    None: (open, ""),
+    "gzip": (gzip.open, ".gz"),
+    "lzma": (lzma.open, ".xz")
+}
+
+def timestamp_ms(timestamp):
+    """Milliseconds since the epoch for an ISO timestamp (None if missing or malformed)"""
+    if not timestamp:
+        return None
+    try:
+        return int(datetime.fromisoformat(timestamp).timestamp() * 1000)
+    except ValueError:
+        return None
+
+def memory_hashes(data):
+    """Every memory_hash mentioned anywhere in an event, in order of first mention"""
+    hashes = []
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            memory_hash = value.get("memory_hash")
+            if isinstance(memory_hash, str) and memory_hash not in hashes:
+                hashes.append(memory_hash)
+            pending.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            pending.extend(reversed(value))
+    return hashes
+
+def event_matches(event, memory_hash=None, event_type=None, since_ms=None, until_ms=None):
+    """Whether an event passes /log query filters; the time range is inclusive"""
+    if event_type and event_type not in (event.get("event_type"), event.get("category")):
+        return False
+    if since_ms is not None or until_ms is not None:
+        ms = timestamp_ms(event.get("timestamp"))
+        if ms is None or (since_ms is not None and ms < since_ms) or (until_ms is not None and ms > until_ms):
+            return False
+    if memory_hash and memory_hash not in memory_hashes(event):
+        return False
+    return True
+
+class SegmentStats:
+    """Time range, sessions and event counts of one segment"""
+    __slots__ = ("first_timestamp", "last_timestamp", "session_ids", "events", "categories", "bytes")
+
+    def __init__(self):
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.session_ids = []
+        self.events = 0
+        self.categories = {}
+        self.bytes = 0
+
+    def add(self, category, data, size):
+        timestamp = data.get("timestamp")
+        if timestamp:
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+            self.last_timestamp = timestamp
+        session_id = data.get("session_id")
+        if session_id and session_id not in self.session_ids:
+            self.session_ids.append(session_id)
+        self.events += 1
+        self.categories[category] = self.categories.get(category, 0) + 1
+        self.bytes += size
+
+    def to_dict(self):
+        return {
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+            "session_ids": self.session_ids,
+            "events": self.events,
+            "categories": self.categories,
+            "bytes": self.bytes
+        }
+
+class SegmentedLog:
+    """Append-only JSON-lines log split into size- or time-bounded segments
+
+    The active segment is log_file. When it reaches segment_bytes, or is
+    older than segment_seconds, it is compressed to <base>.<sequence>.jsonl.gz
+    (or .xz) and recorded in <base>.manifest.json. Retention keeps at most
+    retain_segments closed segments, retain_bytes of them on disk, and
+    none whose last event is older than retain_days.
+    """
+
+    def __init__(self, log_file, fsync="never", fsync_interval=1.0, segment_bytes=8 * 1024 * 1024,
+                 segment_seconds=None, compression="gzip", retain_segments=None, retain_bytes=None,
+                 retain_days=None):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.log_file = log_file
+        self.base = log_file[:-len(".jsonl")] if log_file.endswith(".jsonl") else log_file
+        self.manifest_file = f"{self.base}.manifest.json"
+
+        # "never" leaves flushing to the OS, "always" syncs every write,
+        # "interval" syncs at most once per fsync_interval seconds
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.last_fsync = time.monotonic()
+
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.compression = compression
+        self.retain_segments = retain_segments
+        self.retain_bytes = retain_bytes
+        self.retain_days = retain_days
+
+        self.manifest = self._load_manifest()
+        self.lock = threading.Lock()  # Direct-mode writers share the active segment
+        self.fd = None
+        self._open_active()
+        self._apply_retention()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"next_sequence": 1, "segments": []}
+
+    def _save_manifest(self):
+        temp_file = self.manifest_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.manifest_file)
+
+    def _open_active(self):
+        """Open the active segment, rebuilding its stats from what is already in it"""
+        self.active = SegmentStats()
+        for event in self._read_file(self.log_file, open):
+            category = event.pop("category", None)
+            self.active.add(category, event, 0)
+        self.active.bytes = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+
+        self.segment_started = time.time()
+        if self.active.first_timestamp:
+            try:
+                self.segment_started = datetime.fromisoformat(self.active.first_timestamp).timestamp()
+            except ValueError:
+                pass
+
+        # O_APPEND makes every write land at the end of the file
+        self.fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def is_empty(self):
+        return self.active.events == 0 and not self.manifest["segments"]
+
+    def append(self, events):
+        """Write (category, data) events with one write call, rotating afterwards if the segment is full"""
+        with self.lock:
+            lines = []
+            for category, data in events:
+                line = json.dumps({"category": category, **data}, ensure_ascii=False) + "\n"
+                self.active.add(category, data, len(line.encode('utf-8')))
+                lines.append(line)
+            os.write(self.fd, "".join(lines).encode('utf-8'))
+
+            if self.fsync == "always" or (self.fsync == "interval"
+                                          and time.monotonic() - self.last_fsync >= self.fsync_interval):
+                os.fsync(self.fd)
+                self.last_fsync = time.monotonic()
+
+            if self.active.bytes >= self.segment_bytes or (
+                    self.segment_seconds and time.time() - self.segment_started >= self.segment_seconds):
+                self._rotate()
+
+    def rotate(self):
+        """Close the active segment now (if it has any events)"""
+        with self.lock:
+            if self.active.events:
+                self._rotate()
+
+    def _rotate(self):
+        os.close(self.fd)
+        self.fd = None
+
+        sequence = self.manifest["next_sequence"]
+        opener, suffix = COMPRESSORS[self.compression]
+        segment_file = f"{self.base}.{sequence:06d}.jsonl{suffix}"
+        if self.compression:
+            with open(self.log_file, 'rb') as source, opener(segment_file + ".tmp", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.replace(segment_file + ".tmp", segment_file)
+            os.remove(self.log_file)
+        else:
+            os.replace(self.log_file, segment_file)
+
+        self.manifest["segments"].append({
+            "file": os.path.basename(segment_file),
+            "sequence": sequence,
+            "compression": self.compression,
+            "compressed_bytes": os.path.getsize(segment_file),
+            **self.active.to_dict()
+        })
+        self.manifest["next_sequence"] = sequence + 1
+        self._apply_retention()
+        self._save_manifest()
+        self._open_active()
+
+    def _apply_retention(self):
+        """Delete the oldest closed segments the retention policy no longer covers"""
+        segments = self.manifest["segments"]
+        keep = len(segments)
+        if self.retain_segments is not None:
+            keep = min(keep, self.retain_segments)
+        if self.retain_bytes is not None:
+            kept_bytes = 0
+            for count, segment in enumerate(reversed(segments)):
+                kept_bytes += segment["compressed_bytes"]
+                if kept_bytes > self.retain_bytes:
+                    keep = min(keep, count)
+                    break
+        if self.retain_days is not None:
+            cutoff = time.time() - self.retain_days * 86400
+            for count, segment in enumerate(reversed(segments)):
+                last = segment.get("last_timestamp")
+                if last and datetime.fromisoformat(last).timestamp() < cutoff:
+                    keep = min(keep, count)
+                    break
+
+        expired = segments[:len(segments) - keep]
+        if not expired:
+            return
+        for segment in expired:
+            try:
+                os.remove(self._segment_path(segment))
+            except FileNotFoundError:
+                pass
+        del segments[:len(expired)]
+        self._save_manifest()
+
+    def _segment_path(self, segment):
+        return os.path.join(os.path.dirname(self.log_file), segment["file"])
+
+    def _read_file(self, path, opener, start=0, stop=None):
+        """Events in a segment file, optionally only those between two byte offsets of its plain text"""
+        try:
+            with opener(path, 'rb') as f:
+                if start:
+                    f.seek(start)
+                offset = start
+                for line in f:
+                    offset += len(line)
+                    if stop is not None and offset > stop:
+                        break
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue  # A torn last line from a crash mid-write
+        except FileNotFoundError:
+            return
+
+    def read(self, categories=None):
+        """Yield events oldest first across closed segments and the active one
+
+        Closed segments the manifest shows hold none of categories are skipped.
+        """
+        with self.lock:
+            segments = list(self.manifest["segments"])
+        for segment in segments:
+            if categories is not None and not any(segment["categories"].get(category) for category in categories):
+                continue
+            opener = COMPRESSORS[segment.get("compression")][0]
+            for event in self._read_file(self._segment_path(segment), opener):
+                if categories is None or event.get("category") in categories:
+                    yield event
+        for event in self._read_file(self.log_file, open):
+            if categories is None or event.get("category") in categories:
+                yield event
+
+    def position(self):
+        """Where the log ends now: the active segment's sequence number and size"""
+        with self.lock:
+            return {"sequence": self.manifest["next_sequence"], "offset": self.active.bytes}
+
+    def position_valid(self, position):
+        """Whether a position taken earlier is still at or before the end of this log"""
+        end = self.position()
+        try:
+            return (position["sequence"], position["offset"]) <= (end["sequence"], end["offset"])
+        except (TypeError, KeyError):
+            return False
+
+    def read_range(self, start=None, end=None):
+        """Yield events after position start (from the beginning if None) up to position end
+
+        Segments removed by retention are simply missing from the range.
+        """
+        start = start or {"sequence": 0, "offset": 0}
+        end = end or self.position()
+        with self.lock:
+            segments = list(self.manifest["segments"])
+        for segment in segments:
+            sequence = segment["sequence"]
+            if start["sequence"] <= sequence < end["sequence"]:
+                opener = COMPRESSORS[segment.get("compression")][0]
+                yield from self._read_file(self._segment_path(segment), opener,
+                                           start["offset"] if sequence == start["sequence"] else 0)
+
+        # The segment that was active at end may have been rotated since
+        with self.lock:
+            closed = next((segment for segment in self.manifest["segments"]
+                           if segment["sequence"] == end["sequence"]), None)
+        path, opener = ((self._segment_path(closed), COMPRESSORS[closed.get("compression")][0]) if closed
+                        else (self.log_file, open))
+        yield from self._read_file(path, opener, start["offset"] if end["sequence"] == start["sequence"] else 0,
+                                   end["offset"])
+
+    def query(self, memory_hash=None, event_type=None, since_ms=None, until_ms=None, limit=50):
+        """Most recent events matching the filters, newest first (a full scan of the log)"""
+        matches = []
+        for event in self.read():
+            if event_matches(event, memory_hash, event_type, since_ms, until_ms):
+                matches.append(event)
+                if len(matches) > limit:
+                    del matches[0]
+        return matches[::-1]
+
+    def stats(self):
+        """Segment count, events and bytes on disk"""
+        with self.lock:
+            segments = self.manifest["segments"]
+            return {
+                "segments": len(segments),
+                "events": sum(segment["events"] for segment in segments) + self.active.events,
+                "disk_bytes": sum(segment["compressed_bytes"] for segment in segments) + self.active.bytes,
+                "active_bytes": self.active.bytes
+            }
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None:
+                if self.fsync != "never":
+                    os.fsync(self.fd)
+                os.close(self.fd)
+                self.fd = None
+
+class SQLiteLog:
+    """Activity log in SQLite (WAL mode) with indexed tables for reports and audits
+
+    Every event is a row in events, in logging order. Conversations and
+    snapshots also get a row in their own table with the columns reports
+    aggregate over, and event_memories indexes which memories each event
+    mentions (snapshots, which mention every memory, are left out).
+    Each append is one transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY,
+            category TEXT NOT NULL,
+            event_type TEXT,
+            timestamp TEXT,
+            ts_ms INTEGER,
+            session_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS events_type_time ON events (event_type, ts_ms);
+        CREATE INDEX IF NOT EXISTS events_category_time ON events (category, ts_ms);
+        CREATE INDEX IF NOT EXISTS events_time ON events (ts_ms);
+        CREATE INDEX IF NOT EXISTS events_session ON events (session_id);
+
+        CREATE TABLE IF NOT EXISTS event_memories (
+            event_id INTEGER NOT NULL REFERENCES events (id),
+            memory_hash TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS event_memories_hash ON event_memories (memory_hash, event_id);
+
+        CREATE TABLE IF NOT EXISTS conversations (
+            event_id INTEGER PRIMARY KEY REFERENCES events (id),
+            ts_ms INTEGER,
+            session_id TEXT,
+            conversation_id INTEGER,
+            memories_recalled INTEGER,
+            memories_learned INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS conversations_time ON conversations (ts_ms);
+
+        CREATE TABLE IF NOT EXISTS snapshots (
+            event_id INTEGER PRIMARY KEY REFERENCES events (id),
+            ts_ms INTEGER,
+            session_id TEXT,
+            day INTEGER,
+            memory_count INTEGER,
+            average_strength REAL
+        );
+        CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots (ts_ms);
+    """
+
+    def __init__(self, db_file, fsync="never"):
+        self.db_file = db_file
+        self.log_file = db_file
+
+        # Writes come from the log writer thread, reads from the terminal; WAL lets them overlap
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # fsync "always" syncs every transaction; otherwise only at WAL checkpoints
+        self.connection.execute(f"PRAGMA synchronous={'FULL' if fsync == 'always' else 'NORMAL'}")
+        self.connection.executescript(self.SCHEMA)
+        self.lock = threading.Lock()
+
+        self.reader = sqlite3.connect(db_file, check_same_thread=False)
+        self.read_lock = threading.Lock()
+
+    def is_empty(self):
+        with self.read_lock:
+            return self.reader.execute("SELECT NOT EXISTS (SELECT 1 FROM events)").fetchone()[0] == 1
+
+    def append(self, events):
+        """Store (category, data) events in one transaction"""
+        with self.lock, self.connection:
+            for category, data in events:
+                ms = timestamp_ms(data.get("timestamp"))
+                session_id = data.get("session_id")
+                cursor = self.connection.execute(
+                    "INSERT INTO events (category, event_type, timestamp, ts_ms, session_id, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (category, data.get("event_type"), data.get("timestamp"), ms, session_id,
+                     json.dumps(data, ensure_ascii=False)))
+                event_id = cursor.lastrowid
+
+                if category == "memory_snapshots":
+                    strengths = data.get("strength_distribution", {})
+                    self.connection.execute(
+                        "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                        (event_id, ms, session_id, data.get("day"), len(data.get("memories", [])),
+                         strengths.get("average")))
+                    continue
+
+                if category == "conversation_logs":
+                    memory_context = data.get("memory_context", {})
+                    self.connection.execute(
+                        "INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?)",
+                        (event_id, ms, session_id, data.get("conversation_id"),
+                         len(memory_context.get("memories_recalled", [])),
+                         len(memory_context.get("memories_learned", []))))
+                self.connection.executemany("INSERT INTO event_memories VALUES (?, ?)",
+                                            [(event_id, memory_hash) for memory_hash in memory_hashes(data)])
+
+    def _decode(self, rows):
+        for category, data in rows:
+            yield {"category": category, **json.loads(data)}
+
+    def _stream(self, sql, parameters=()):
+        """Rows of a query read incrementally on a connection of its own (WAL keeps it a consistent snapshot)"""
+        connection = sqlite3.connect(self.db_file)
+        try:
+            yield from connection.execute(sql, parameters)
+        finally:
+            connection.close()
+
+    def read(self, categories=None):
+        """Yield events oldest first, optionally only from some categories"""
+        if categories is None:
+            return self._decode(self._stream("SELECT category, data FROM events ORDER BY id"))
+        categories = list(categories)
+        return self._decode(self._stream(
+            f"SELECT category, data FROM events WHERE category IN ({','.join('?' * len(categories))}) ORDER BY id",
+            categories))
+
+    def position(self):
+        """Id of the last event logged so far (0 when empty)"""
+        with self.read_lock:
+            return self.reader.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def position_valid(self, position):
+        return isinstance(position, int) and position <= self.position()
+
+    def read_range(self, start=None, end=None):
+        """Yield events logged after id start (from the beginning if None) up to id end"""
+        end = self.position() if end is None else end
+        return self._decode(self._stream("SELECT category, data FROM events WHERE id > ? AND id <= ? ORDER BY id",
+                                         (start or 0, end)))
+
+    def query(self, memory_hash=None, event_type=None, since_ms=None, until_ms=None, limit=50):
+        """Most recent events matching the filters, newest first, answered from the indexes"""
+        conditions = []
+        parameters = []
+        if memory_hash:
+            conditions.append("id IN (SELECT event_id FROM event_memories WHERE memory_hash = ?)")
+            parameters.append(memory_hash)
+        if event_type:
+            conditions.append("(event_type = ? OR category = ?)")
+            parameters.extend((event_type, event_type))
+        if since_ms is not None:
+            conditions.append("ts_ms >= ?")
+            parameters.append(since_ms)
+        if until_ms is not None:
+            conditions.append("ts_ms <= ?")
+            parameters.append(until_ms)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.read_lock:
+            rows = self.reader.execute(f"SELECT category, data FROM events {where} ORDER BY id DESC LIMIT ?",
+                                       parameters + [limit]).fetchall()
+        return list(self._decode(rows))
+
+    def accumulate(self, accumulator, start=None, end=None):
+        """Add the events logged after id start up to id end to a ReportAccumulator
+
+        Counts come from aggregate queries; only the two columns percentiles
+        need are streamed, row by row.
+        """
+        end = self.position() if end is None else end
+        span = "id > ? AND id <= ?"
+        parameters = (start or 0, end)
+        with self.read_lock:
+            execute = self.reader.execute
+            category_counts = execute(f"SELECT category, COUNT(*) FROM events WHERE {span} GROUP BY category",
+                                      parameters).fetchall()
+            event_types = execute(f"SELECT COALESCE(event_type, 'unknown'), COUNT(*) FROM events "
+                                  f"WHERE {span} AND category = 'memory_events' GROUP BY event_type",
+                                  parameters).fetchall()
+
+        for category, count in category_counts:
+            accumulator.events += count
+            accumulator.category_counts[category] = accumulator.category_counts.get(category, 0) + count
+        for event_type, count in event_types:
+            accumulator.memory_event_types[event_type] = accumulator.memory_event_types.get(event_type, 0) + count
+            if event_type == "memory_interference":
+                accumulator.interference_events += count
+
+        for memories_recalled, memories_learned in self._stream(
+                "SELECT memories_recalled, memories_learned FROM conversations WHERE event_id > ? AND event_id <= ?",
+                parameters):
+            accumulator.add_conversation(memories_recalled, memories_learned)
+        for (strength_change,) in self._stream(
+                "SELECT json_extract(data, '$.memory_details.strength_change') FROM events "
+                f"WHERE {span} AND category = 'memory_events' AND event_type = 'memory_decay'", parameters):
+            accumulator.add_decay(strength_change or 0)
+
+    def stats(self):
+        """Event count and bytes on disk"""
+        with self.read_lock:
+            events = self.reader.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        disk_bytes = sum(os.path.getsize(self.db_file + suffix) for suffix in ("", "-wal")
+                         if os.path.exists(self.db_file + suffix))
+        return {"segments": 0, "events": events, "disk_bytes": disk_bytes, "active_bytes": disk_bytes}
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.reader.close()
+                self.connection.close()
+                self.connection = None
@@ -1,52 +1,267 @@
+import atexit
 import json
 import os
+import queue
+import threading
+import time
 from datetime import datetime, timezone
 import hashlib
+from akira_logstore import SegmentedLog, SQLiteLog
+from akira_report import ReportAccumulator
+
+# High-volume events that may be dropped or sampled when the buffered writer falls behind
+LOW_PRIORITY_EVENTS = {"memory_recall", "memory_decay", "memory_interference", "prompt_budget"}
+
+class BufferedLogWriter:
+    """Queues log events and writes them in batches from a background thread
+
+    A batch is written once batch_size events are waiting or flush_interval
+    seconds after its first event. When the queue is full, backpressure decides:
+    "block" waits for room, "drop" discards low-priority events, "sample" also
+    keeps only one in sample_every low-priority events once the queue is half full.
+    """
+
+    def __init__(self, write_events, batch_size=64, flush_interval=0.5, max_queue=4096,
+                 backpressure="block", sample_every=10):
+        if backpressure not in ("block", "drop", "sample"):
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        self.write_events = write_events  # Called with a list of (category, data) on the writer thread
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.sample_every = sample_every
+        self.events = queue.Queue(maxsize=max_queue)
+
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.low_priority_seen = 0
+        self.counter_lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self._run, name="akira-log-writer", daemon=True)
+        self.thread.start()
+        self.closed = False
+
+    def submit(self, category, data):
+        """Queue one event; returns False if backpressure dropped it"""
+        if self.closed:
+            raise RuntimeError("Log writer has been closed")
+
+        low_priority = data.get("event_type") in LOW_PRIORITY_EVENTS
+        if low_priority and self.backpressure != "block":
+            with self.counter_lock:
+                self.low_priority_seen += 1
+                sampled_out = (self.backpressure == "sample" and self.events.qsize() >= self.max_queue // 2
+                               and self.low_priority_seen % self.sample_every)
+            if sampled_out:
+                return self._drop()
+            try:
+                self.events.put_nowait((category, data))
+            except queue.Full:
+                return self._drop()
+        else:
+            self.events.put((category, data))
+
+        with self.counter_lock:
+            self.queued += 1
+        return True
+
+    def _drop(self):
+        with self.counter_lock:
+            self.dropped += 1
+        return False
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is written; False on timeout"""
+        if self.closed:
+            return True
+        done = threading.Event()
+        self.events.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """Write everything still queued, then stop the writer thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.events.put(None)
+        self.thread.join(timeout)
+
+    def stats(self):
+        with self.counter_lock:
+            return {
+                "queued": self.queued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "waiting": self.events.qsize(),
+                "backpressure": self.backpressure
+            }
+
+    def _run(self):
+        batch = []
+        batch_started = None
+        stopping = False
+        while not stopping:
+            timeout = None if not batch else max(0.0, batch_started + self.flush_interval - time.monotonic())
+            try:
+                item = self.events.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # Flush interval elapsed
+
+            markers = []
+            if item is None:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                markers.append(item)
+            elif item is not False:
+                if not batch:
+                    batch_started = time.monotonic()
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                try:
+                    self.write_events(batch)
+                except Exception as e:
+                    print(f"⚠️ Logging error: {e}")
+                with self.counter_lock:
+                    self.written += len(batch)
+                    self.batches += 1
+                batch = []
+            for marker in markers:
+                marker.set()
+
+def read_legacy_log(legacy_file):
+    """(category, data) events of a nested akira_memories.json log, akira_info first, then oldest first"""
+    with open(legacy_file, 'r', encoding='utf-8') as f:
+        log_data = json.load(f)
+    
+    events = []
+    for category, entries in log_data.items():
+        if category != "akira_info" and isinstance(entries, list):
+            events.extend((category, entry) for entry in entries)
+    events.sort(key=lambda event: event[1].get("timestamp", ""))  # Stable: ties keep file order
+    return [("akira_info", log_data.get("akira_info", {}))] + events
+
+def migrate_legacy_log(legacy_file, log_file):
+    """Convert a nested akira_memories.json log into the line-per-event format
+
+    Events are written oldest first with their category, the akira_info block
+    becomes the first line, and the old file is renamed to *.migrated.
+    Returns the number of events migrated.
+    """
+    events = read_legacy_log(legacy_file)
+    
+    temp_file = log_file + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        for category, entry in events:
+            f.write(json.dumps({"category": category, **entry}, ensure_ascii=False) + "\n")
+    os.replace(temp_file, log_file)
+    os.replace(legacy_file, legacy_file + ".migrated")
+    return len(events) - 1
 
 class AkiraMemoryLogger:
-    def __init__(self, log_file="akira_memories.json"):
-        self.log_file = log_file
+    def __init__(self, log_file="akira_memories.jsonl", legacy_file="akira_memories.json", fsync="never",
+                 fsync_interval=1.0, buffered=False, backpressure="block", store="segments",
+                 db_file="akira_memories.db", segment_bytes=8 * 1024 * 1024, segment_seconds=None,
+                 compression="gzip", retain_segments=None, retain_bytes=None, retain_days=None,
+                 report_checkpoint_file="akira_report_checkpoint.json", **writer_options):
         self.session_id = hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
         self.conversation_count = 0
         
-        # Initialize log file if it doesn't exist
-        if not os.path.exists(log_file):
+        if store == "sqlite":
+            # Indexed tables; each write (each batch when buffered) is one transaction
+            self.store = SQLiteLog(db_file, fsync=fsync)
+            if legacy_file and os.path.exists(legacy_file) and self.store.is_empty():
+                events = read_legacy_log(legacy_file)
+                self.store.append(events)
+                os.replace(legacy_file, legacy_file + ".migrated")
+                print(f"📦 Migrated {len(events) - 1} log events from {legacy_file} to {db_file}")
+        elif store == "segments":
+            # One-shot upgrade from the old nested JSON log
+            if legacy_file and os.path.exists(legacy_file) and not os.path.exists(log_file):
+                migrated = migrate_legacy_log(legacy_file, log_file)
+                print(f"📦 Migrated {migrated} log events from {legacy_file} to {log_file}")
+            
+            # Rotating segments; fsync applies to every write (every batch when buffered)
+            self.store = SegmentedLog(log_file, fsync=fsync, fsync_interval=fsync_interval,
+                                      segment_bytes=segment_bytes, segment_seconds=segment_seconds,
+                                      compression=compression, retain_segments=retain_segments,
+                                      retain_bytes=retain_bytes, retain_days=retain_days)
+        else:
+            raise ValueError(f"Unknown log store: {store}")
+        self.log_file = self.store.log_file
+        self.report_checkpoint_file = report_checkpoint_file
+        
+        self.writer = None
+        if self.store.is_empty():
             self._initialize_log_file()
+        
+        # Buffered mode hands events to a background writer so callers never wait on disk
+        if buffered:
+            self.writer = BufferedLogWriter(self.store.append, backpressure=backpressure, **writer_options)
+            atexit.register(self.close)
     
     def _initialize_log_file(self):
-        """Initialize the log file with basic structure"""
-        initial_data = {
-            "akira_info": {
-                "session_id": self.session_id,
-                "birth_time": datetime.now(timezone.utc).isoformat(),
-                "description": "Akira's Memory & Consciousness Activity Log"
-            },
-            "memory_events": [],
-            "conversation_logs": [],
-            "memory_snapshots": [],
-            "consciousness_events": []
-        }
-        
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(initial_data, f, indent=2, ensure_ascii=False)
+        """Start the log with its akira_info line"""
+        self._append_to_log("akira_info", {
+            "session_id": self.session_id,
+            "birth_time": datetime.now(timezone.utc).isoformat(),
+            "description": "Akira's Memory & Consciousness Activity Log"
+        })
     
     def _append_to_log(self, category, data):
-        """Append data to a specific category in the log file"""
+        """Append one event to the log as a single JSON line (queued in buffered mode)"""
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                log_data = json.load(f)
-            
-            if category not in log_data:
-                log_data[category] = []
-            
-            log_data[category].append(data)
-            
-            with open(self.log_file, 'w', encoding='utf-8') as f:
-                json.dump(log_data, f, indent=2, ensure_ascii=False)
+            if self.writer is not None:
+                self.writer.submit(category, data)
+            else:
+                self.store.append([(category, data)])
                 
         except Exception as e:
             print(f"⚠️ Logging error: {e}")
     
+    def flush(self, timeout=None):
+        """Make every event logged so far visible in the log"""
+        if self.writer is not None:
+            return self.writer.flush(timeout)
+        return True
+    
+    def stats(self):
+        """Counters for queued, written and dropped events, plus segments on disk"""
+        if self.writer is not None:
+            return {"mode": "buffered", **self.writer.stats(), **self.store.stats()}
+        return {"mode": "direct", **self.store.stats()}
+    
+    def close(self):
+        """Write any queued events, then sync and close the log"""
+        if self.writer is not None:
+            self.writer.close()
+        self.store.close()
+    
+    def read_events(self, categories=None):
+        """Yield logged events oldest first across all segments, optionally only from some categories
+        
+        Each event keeps its "category" field.
+        """
+        return self.store.read(categories)
+    
+    def query(self, memory_hash=None, event_type=None, since_ms=None, until_ms=None, limit=50):
+        """Most recent events about a memory, of a type (or category) or in a time range, newest first
+        
+        since_ms and until_ms are milliseconds since the epoch, inclusive.
+        """
+        self.flush()
+        return self.store.query(memory_hash, event_type, since_ms, until_ms, limit)
+    
+    def read_category(self, category):
+        """Every logged event in one category, oldest first"""
+        return list(self.read_events((category,)))
+    
     def log_conversation(self, user_input, ai_response, recalled_memories, learned_memories, memory_stats):
         """Log a complete conversation with memory context"""
         self.conversation_count += 1
@@ -136,6 +351,21 @@ class AkiraMemoryLogger:
         
         self._append_to_log("memory_events", recall_event)
     
+    def log_prompt_budget(self, recalled_count, included_count, truncated_count, tokens_used, token_limit):
+        """Log recalled memories left out of a prompt to stay within its token budget"""
+        budget_event = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "session_id": self.session_id,
+            "event_type": "prompt_budget",
+            "memories_recalled": recalled_count,
+            "memories_included": included_count,
+            "memories_truncated": truncated_count,
+            "memory_tokens_used": tokens_used,
+            "memory_token_limit": token_limit
+        }
+        
+        self._append_to_log("memory_events", budget_event)
+    
     def log_memory_decay(self, memory, day, decay_factors):
         """Log memory decay events"""
         decay_event = {
@@ -197,13 +427,14 @@ class AkiraMemoryLogger:
         
         self._append_to_log("memory_events", consolidation_event)
     
-    def log_day_advance(self, day, memory_stats, random_activations=None):
+    def log_day_advance(self, day, memory_stats, random_activations=None, days_advanced=1):
         """Log day advancement and its effects"""
         day_event = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "session_id": self.session_id,
             "event_type": "day_advance",
             "day": day,
+            "days_advanced": days_advanced,
             "memory_stats_after": memory_stats,
             "random_activations": random_activations or []
         }
@@ -212,6 +443,7 @@ class AkiraMemoryLogger:
     
     def create_memory_snapshot(self, memory_system):
         """Create a comprehensive snapshot of all memories"""
+        memory_system.materialize_all()
         snapshot = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "session_id": self.session_id,
@@ -234,33 +466,17 @@ class AkiraMemoryLogger:
                     "day_created": mem.day_created.isoformat(),
                     "persistence_factor": round(mem.persistence_factor, 3),
                     "volatility_factor": round(mem.volatility_factor, 3),
-                    "strength_history": [round(s, 3) for s in mem.strength_history],
-                    "access_history": mem.access_history
+                    "strength_history": mem.strength_history.to_list(3),
+                    "access_history": mem.access_history.to_list()
                 } for mem in memory_system.memories
             ],
-            "memory_categories": self._analyze_memory_categories(memory_system.memories),
-            "strength_distribution": self._analyze_strength_distribution(memory_system.memories)
+            "memory_categories": memory_system.get_context_stats(),
+            "strength_distribution": self._analyze_strength_distribution(memory_system.memories),
+            "strength_histogram": memory_system.strength_stats.histogram_buckets()
         }
         
         self._append_to_log("memory_snapshots", snapshot)
     
-    def _analyze_memory_categories(self, memories):
-        """Analyze memories by category"""
-        categories = {}
-        for mem in memories:
-            if mem.context not in categories:
-                categories[mem.context] = {"count": 0, "avg_strength": 0, "total_strength": 0}
-            categories[mem.context]["count"] += 1
-            categories[mem.context]["total_strength"] += mem.get_total_strength()
-        
-        for category in categories:
-            categories[category]["avg_strength"] = round(
-                categories[category]["total_strength"] / categories[category]["count"], 3
-            )
-            del categories[category]["total_strength"]
-        
-        return categories
-    
     def _analyze_strength_distribution(self, memories):
         """Analyze distribution of memory strengths"""
         if not memories:
@@ -276,24 +492,39 @@ class AkiraMemoryLogger:
             "lowest": round(min(strengths), 3)
         }
     
-    def generate_summary_report(self):
-        """Generate a summary report of Akira's memory activity"""
+    def generate_summary_report(self, since_checkpoint=False):
+        """Generate a summary report of Akira's memory activity
+        
+        One streaming pass with fixed-size accumulators. With since_checkpoint,
+        only events logged after the last report are read and merged into the
+        aggregates saved with it. Every report saves a new checkpoint.
+        """
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                log_data = json.load(f)
+            self.flush()
+            end = self.store.position()
+            
+            accumulator = ReportAccumulator()
+            start = None
+            checkpoint = self._load_report_checkpoint() if since_checkpoint else None
+            if checkpoint:
+                accumulator = ReportAccumulator.from_dict(checkpoint["aggregates"])
+                start = checkpoint["position"]
+            
+            new_events = ReportAccumulator(percentiles=accumulator.sketches is not None)
+            if isinstance(self.store, SQLiteLog):
+                self.store.accumulate(new_events, start, end)
+            else:
+                for event in self.store.read_range(start, end):
+                    new_events.add(event)
+            accumulator.merge(new_events)
+            self._save_report_checkpoint(end, accumulator)
             
             report = {
                 "generated_at": datetime.now(timezone.utc).isoformat(),
                 "session_id": self.session_id,
-                "summary": {
-                    "total_conversations": len(log_data.get("conversation_logs", [])),
-                    "total_memory_events": len(log_data.get("memory_events", [])),
-                    "total_consciousness_events": len(log_data.get("consciousness_events", [])),
-                    "memory_snapshots": len(log_data.get("memory_snapshots", []))
-                },
-                "memory_activity_breakdown": self._analyze_memory_events(log_data.get("memory_events", [])),
-                "learning_patterns": self._analyze_learning_patterns(log_data.get("conversation_logs", [])),
-                "forgetting_patterns": self._analyze_forgetting_patterns(log_data.get("memory_events", []))
+                "events_read": new_events.events,
+                "merged_with_checkpoint": checkpoint["saved_at"] if checkpoint else None,
+                **accumulator.sections()
             }
             
             report_file = f"akira_memory_report_{self.session_id}.json"
@@ -306,53 +537,25 @@ class AkiraMemoryLogger:
             print(f"⚠️ Error generating report: {e}")
             return None
     
-    def _analyze_memory_events(self, events):
-        """Analyze types of memory events"""
-        event_types = {}
-        for event in events:
-            event_type = event.get("event_type", "unknown")
-            if event_type not in event_types:
-                event_types[event_type] = 0
-            event_types[event_type] += 1
-        return event_types
-    
-    def _analyze_learning_patterns(self, conversations):
-        """Analyze learning patterns from conversations"""
-        total_learned = 0
-        learning_conversations = 0
-        
-        for conv in conversations:
-            memories_learned = len(conv.get("memory_context", {}).get("memories_learned", []))
-            if memories_learned > 0:
-                learning_conversations += 1
-                total_learned += memories_learned
-        
-        return {
-            "total_memories_learned": total_learned,
-            "conversations_with_learning": learning_conversations,
-            "learning_rate": round(learning_conversations / max(1, len(conversations)), 3)
-        }
+    def _load_report_checkpoint(self):
+        """Aggregates and log position saved by the last report, if they still match this log"""
+        try:
+            with open(self.report_checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if checkpoint.get("log_file") != self.log_file or not self.store.position_valid(checkpoint.get("position")):
+            return None  # Another log, or this one was reset since
+        return checkpoint
     
-    def _analyze_forgetting_patterns(self, events):
-        """Analyze forgetting/decay patterns"""
-        decay_events = [e for e in events if e.get("event_type") == "memory_decay"]
-        interference_events = [e for e in events if e.get("event_type") == "memory_interference"]
-        
-        return {
-            "total_decay_events": len(decay_events),
-            "total_interference_events": len(interference_events),
-            "average_strength_loss_per_decay": self._calculate_average_decay_loss(decay_events)
+    def _save_report_checkpoint(self, position, accumulator):
+        checkpoint = {
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "log_file": self.log_file,
+            "position": position,
+            "aggregates": accumulator.to_dict()
         }
-    
-    def _calculate_average_decay_loss(self, decay_events):
-        """Calculate average strength loss per decay event"""
-        if not decay_events:
-            return 0
-        
-        total_loss = 0
-        for event in decay_events:
-            strength_change = event.get("memory_details", {}).get("strength_change", 0)
-            if strength_change < 0:  # Only count actual losses
-                total_loss += abs(strength_change)
-        
-        return round(total_loss / len(decay_events), 3) if decay_events else 0 
\ No newline at end of file
+        temp_file = self.report_checkpoint_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(temp_file, self.report_checkpoint_file) 
\ No newline at end of file
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Akira Model Routing
+Picks the Ollama model for each task (replies, learning extraction,
+summarization), keeps those models resident and records per-task latency,
+all through one shared LLM backend guarded by deadlines, retries and a
+circuit breaker
+"""
+
+import random
+import threading
+import time
+from akira_backends import OllamaBackend
+
+# Replies use the main model; background tasks default to a small local one
+DEFAULT_MODELS = {
+    "reply": "llama3",
+    "learning": "llama3.2:1b",
+    "summary": "llama3.2:1b"
+}
+
+# Per-call deadlines in seconds; replies get the longest since CPU-only generation is slow
+DEFAULT_DEADLINES = {
+    "reply": 60.0,
+    "learning": 30.0,
+    "summary": 45.0
+}
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling a model server that has been failing"""
+
+class CircuitBreaker:
+    """Stops calling the model server after repeated failures, then probes it again
+
+    closed: calls go through. open: calls fail fast until reset_timeout has
+    passed. half_open: one trial call decides whether to close or re-open.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0  # Consecutive failed calls
+        self.opened_at = None
+        self.trips = 0
+        self.last_error = None
+        self.last_failure_time = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.trial_in_flight:
+                    return False
+                self.trial_in_flight = True
+            return self.state != "open"
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            self.last_failure_time = time.time()
+            self.trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a trial call through"""
+        with self.lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def status(self):
+        """State, failure counts and timing for /status"""
+        retry_in = self.retry_in()
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "trips": self.trips,
+                "retry_in_seconds": round(retry_in, 1),
+                "last_error": self.last_error,
+                "last_failure_time": self.last_failure_time
+            }
+
+def tagged(model):
+    """Model name with Ollama's implicit :latest tag made explicit"""
+    return model if ":" in model else f"{model}:latest"
+
+class TaskLatency:
+    """Running latency totals for one task"""
+    __slots__ = ("calls", "total_seconds", "last_seconds", "first_token_calls", "first_token_seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+        self.first_token_calls = 0
+        self.first_token_seconds = 0.0
+
+    def record(self, seconds, first_token_seconds=None):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        if first_token_seconds is not None:
+            self.first_token_calls += 1
+            self.first_token_seconds += first_token_seconds
+
+    def summary(self):
+        summary = {
+            "calls": self.calls,
+            "avg_seconds": round(self.total_seconds / self.calls, 3) if self.calls else 0,
+            "last_seconds": round(self.last_seconds, 3)
+        }
+        if self.first_token_calls:
+            summary["avg_first_token_seconds"] = round(self.first_token_seconds / self.first_token_calls, 3)
+        return summary
+
+class ModelRouter:
+    def __init__(self, models=None, keep_alive="30m", backend=None, deadlines=None, max_retries=2,
+                 retry_backoff=0.5, breaker=None):
+        self.models = dict(DEFAULT_MODELS)
+        self.models.update(models or {})
+        self.backend = backend if backend is not None else OllamaBackend()
+
+        # Every task shares one breaker; each call gets its task's deadline and a few retries
+        self.deadlines = dict(DEFAULT_DEADLINES)
+        self.deadlines.update(deadlines or {})
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff  # Seconds before the first retry, doubling with jitter
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+
+        # How long Ollama keeps each model loaded after a call
+        self.keep_alive = keep_alive
+
+        self.latency = {}
+        self.lock = threading.Lock()  # The learning worker records latency too
+
+        # model -> seconds its background preload took
+        self.preload_seconds = {}
+        self.preload_thread = None
+
+    def model(self, task):
+        """Model configured for a task (unknown tasks use the reply model)"""
+        return self.models.get(task, self.models["reply"])
+
+    def chat(self, task, messages, stream=False, **options):
+        """Chat with the task's model within its deadline, recording how long it took
+
+        Transient failures are retried with jittered backoff while the deadline
+        allows (for streams, only until the first chunk arrives). Raises
+        CircuitOpenError without calling the server while the breaker is open.
+        Streams are timed when exhausted, including time to the first chunk.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"model server unavailable, retrying in {self.breaker.retry_in():.0f}s "
+                                   f"(last error: {self.breaker.last_error})")
+
+        start = time.perf_counter()
+        deadline = start + self.deadlines.get(task, self.deadlines["reply"])
+        attempt = 0
+        while True:
+            try:
+                response = self.backend.chat(self.model(task), messages, stream=stream, keep_alive=self.keep_alive,
+                                             timeout=max(0.1, deadline - time.perf_counter()), **options)
+                if stream:
+                    stream_iterator = iter(response)
+                    first_chunk = next(stream_iterator, None)  # Ollama streams connect lazily
+                break
+            except Exception as e:
+                backoff = self.retry_backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                attempt += 1
+                if (not self.backend.is_transient(e) or attempt > self.max_retries
+                        or time.perf_counter() + backoff >= deadline):
+                    if self.backend.is_transient(e):
+                        self.breaker.record_failure(e)
+                    else:
+                        self.breaker.record_success()  # The server answered; the request was the problem
+                    raise
+                time.sleep(backoff)
+
+        self.breaker.record_success()  # For streams the first chunk shows the server is up
+        if stream:
+            return self._timed_stream(task, stream_iterator, first_chunk, start, deadline)
+
+        self.record(task, time.perf_counter() - start)
+        return response
+
+    def _timed_stream(self, task, stream, first_chunk, start, deadline):
+        first_token_seconds = time.perf_counter() - start
+        try:
+            if first_chunk is not None:
+                yield first_chunk
+            for chunk in stream:
+                if time.perf_counter() > deadline:
+                    raise TimeoutError(f"{task} call passed its {deadline - start:.0f}s deadline")
+                yield chunk
+        except Exception as e:
+            if self.backend.is_transient(e):
+                self.breaker.record_failure(e)
+            raise
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+        self.record(task, time.perf_counter() - start, first_token_seconds)
+
+    def record(self, task, seconds, first_token_seconds=None):
+        with self.lock:
+            self.latency.setdefault(task, TaskLatency()).record(seconds, first_token_seconds)
+
+    def latency_summary(self):
+        """{task: {model, calls, avg_seconds, last_seconds[, avg_first_token_seconds]}}"""
+        with self.lock:
+            return {task: {"model": self.model(task), **latency.summary()}
+                    for task, latency in self.latency.items()}
+
+    def check_connection(self, tasks=("reply", "learning")):
+        """Cheap liveness probe (lists local models, no generation)
+
+        Raises if Ollama can't be reached; returns the routed models that aren't pulled yet.
+        """
+        available = {tagged(name) for name in self.backend.list_models()}
+        return [model for model in dict.fromkeys(self.model(task) for task in tasks)
+                if tagged(model) not in available]
+
+    def preload(self, tasks=("reply", "learning")):
+        """Load the models behind tasks in the background so no turn pays the cold-load cost"""
+        models = list(dict.fromkeys(self.model(task) for task in tasks))
+        self.preload_thread = threading.Thread(target=self._preload, args=(models,),
+                                               name="akira-preload", daemon=True)
+        self.preload_thread.start()
+        return self.preload_thread
+
+    def _preload(self, models):
+        for model in models:
+            start = time.perf_counter()
+            try:
+                self.backend.load(model, self.keep_alive)
+                self.preload_seconds[model] = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                print(f"\n⚠️ Could not preload {model}: {e}")
@@ -131,11 +131,11 @@ class AkiraPersistenceSystem:
     def _serialize_memory_system(self, memory_system):
         """Serialize complete memory system state"""
         memories_data = []
+        memory_system.materialize_all()
         
         for memory in memory_system.memories:
             memory_data = {
                 "content": memory.content,
-                "original_content": memory.original_content,
                 "emotion_weight": memory.emotion_weight,
                 "importance": memory.importance,
                 "context": memory.context,
@@ -152,21 +152,29 @@ class AkiraPersistenceSystem:
                 "day_created": memory.day_created.isoformat(),
                 "content_hash": memory.content_hash,
                 
-                # History
-                "strength_history": memory.strength_history,
-                "access_history": memory.access_history,
+                # History (bounded buffers, stored oldest first)
+                "strength_history": memory.strength_history.to_list(),
+                "access_history": memory.access_history.to_list(),
                 
                 # Memory personality
                 "persistence_factor": memory.persistence_factor,
                 "volatility_factor": memory.volatility_factor
             }
+            
+            # Content is only stored twice if it has actually diverged
+            if memory.original_content != memory.content:
+                memory_data["original_content"] = memory.original_content
+            
             memories_data.append(memory_data)
         
         return {
             "memories": memories_data,
+            "vocabulary": memory_system.vocabulary.tokens,  # Token ids are positions in this list
             "days": memory_system.days,
             "sleep_cycles": memory_system.sleep_cycles,
-            "conversation_history": memory_system.conversation_history
+            "conversation_history": memory_system.conversation_history,  # Recent window; older turns are archived
+            "conversation_summary": memory_system.conversation_summary,
+            "summary_backlog": memory_system.summary_backlog
         }
     
     def _serialize_personality_system(self, personality_system):
@@ -208,15 +216,17 @@ class AkiraPersistenceSystem:
     
     def _restore_memory_system(self, memory_system, data):
         """Restore memory system from serialized data"""
-        from memory_app import Memory
-        
         # Clear existing memories
-        memory_system.memories = []
+        memory_system.clear_memories()
+        memory_system.days = data["days"]
+        
+        # Restore the vocabulary first so re-registered memories keep their token ids
+        memory_system.vocabulary.reset(data.get("vocabulary", ()))
         
         # Restore each memory
         for mem_data in data["memories"]:
             # Create memory object
-            memory = Memory(
+            memory = memory_system.create_memory(
                 mem_data["content"],
                 mem_data["emotion_weight"], 
                 mem_data["importance"],
@@ -224,7 +234,7 @@ class AkiraPersistenceSystem:
             )
             
             # Restore all properties
-            memory.original_content = mem_data["original_content"]
+            memory.original_content = mem_data.get("original_content", mem_data["content"])
             memory.base_strength = mem_data["base_strength"]
             memory.retrieval_strength = mem_data["retrieval_strength"]
             memory.consolidation_strength = mem_data["consolidation_strength"]
@@ -235,18 +245,20 @@ class AkiraPersistenceSystem:
             memory.day_created = datetime.fromisoformat(mem_data["day_created"])
             memory.content_hash = mem_data["content_hash"]
             
-            memory.strength_history = mem_data["strength_history"]
-            memory.access_history = mem_data["access_history"]
+            memory.strength_history.replace(mem_data["strength_history"])
+            memory.access_history.replace(mem_data["access_history"])
             
             memory.persistence_factor = mem_data["persistence_factor"]
             memory.volatility_factor = mem_data["volatility_factor"]
+            memory.invalidate_strength()
             
-            memory_system.memories.append(memory)
+            memory_system.register_memory(memory)
         
         # Restore system state
-        memory_system.days = data["days"]
         memory_system.sleep_cycles = data["sleep_cycles"]
         memory_system.conversation_history = data["conversation_history"]
+        memory_system.conversation_summary = data.get("conversation_summary", "")
+        memory_system.summary_backlog = data.get("summary_backlog", [])
     
     def _restore_personality_system(self, personality_system, data):
         """Restore personality system from serialized data"""
@@ -258,6 +270,7 @@ class AkiraPersistenceSystem:
         personality_system.personality_evolution_count = data["personality_evolution_count"]
         personality_system.dominant_traits_history = data["dominant_traits_history"]
         personality_system.name = data["name"]
+        personality_system.invalidate_prompt()
     
     def _restore_emotional_state(self, comprehensive_monitor, data):
         """Restore emotional state from serialized data"""
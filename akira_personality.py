@@ -4,6 +4,16 @@ from datetime import datetime
 import numpy as np
 
 class PersonalitySystem:
+    # (low, high) cut-offs at which generate_personality_prompt describes a trait
+    # differently: below low, between, above high (None where there is no cut-off)
+    PROMPT_THRESHOLDS = {
+        "openness": (0.3, 0.7), "conscientiousness": (0.3, 0.7), "extraversion": (0.3, 0.7),
+        "agreeableness": (0.3, 0.7), "neuroticism": (0.3, 0.7),
+        "empathy": (None, 0.7), "analytical_thinking": (None, 0.7), "creativity": (None, 0.7),
+        "philosophical_inclination": (None, 0.7), "humor_tendency": (None, 0.6),
+        "verbosity": (0.4, 0.6), "formality_preference": (0.4, 0.6)
+    }
+    
     def __init__(self):
         self.name = "Akira"
         
@@ -41,6 +51,13 @@ class PersonalitySystem:
         # World personality database
         self.personality_archetypes = self._load_personality_database()
         
+        # Cached personality prompt, rebuilt only when a trait crosses a description
+        # threshold or the dominant archetype changes
+        self.prompt_fragment = None
+        self.dominant_type = None
+        self.dominant_margin = 0.0  # Lead of the dominant archetype over the runner-up
+        self.trait_drift = 0.0  # Total trait movement since the archetypes were last ranked
+        
         # Initialize with slight random variations
         self._initialize_personality()
     
@@ -122,7 +139,7 @@ class PersonalitySystem:
             current_value = getattr(self, trait)
             variation = random.uniform(-0.1, 0.1)
             new_value = max(0.0, min(1.0, current_value + variation))
-            setattr(self, trait, new_value)
+            self.set_trait(trait, new_value)
         
         self._record_personality_snapshot("initialization")
     
@@ -181,7 +198,7 @@ class PersonalitySystem:
             if hasattr(self, trait):
                 current_value = getattr(self, trait)
                 new_value = max(0.0, min(1.0, current_value + change))
-                setattr(self, trait, new_value)
+                self.set_trait(trait, new_value)
         
         # Record significant changes
         if personality_changes:
@@ -191,6 +208,51 @@ class PersonalitySystem:
                 "timestamp": datetime.now().isoformat()
             })
     
+    def set_trait(self, trait, value):
+        """Change a trait, invalidating the cached prompt only if its description changes"""
+        previous = getattr(self, trait)
+        setattr(self, trait, value)
+        self.trait_drift += abs(value - previous)
+        
+        thresholds = self.PROMPT_THRESHOLDS.get(trait)
+        if thresholds and self._prompt_band(previous, thresholds) != self._prompt_band(value, thresholds):
+            self.prompt_fragment = None
+    
+    @staticmethod
+    def _prompt_band(value, thresholds):
+        low, high = thresholds
+        return (low is None or value >= low) + (high is not None and value > high)
+    
+    def invalidate_prompt(self):
+        """Force the next prompt to be rebuilt (after traits are replaced wholesale)"""
+        self.prompt_fragment = None
+        self.dominant_type = None
+    
+    def _refresh_dominant_type(self):
+        """Re-rank archetypes only when traits have moved enough to change the winner"""
+        # A match score moves by at most the total trait drift, so the winner can only
+        # change once twice the drift reaches its lead over the runner-up
+        if self.dominant_type is not None and 2 * self.trait_drift < self.dominant_margin:
+            return
+        
+        # Same scan (and tie-breaking) as get_dominant_personality_type, also tracking the runner-up
+        best, best_score, runner_up_score = None, -1, -1
+        for archetypes in self.personality_archetypes.values():
+            for archetype_name, archetype_data in archetypes.items():
+                score = self._calculate_personality_match(archetype_data["traits"])
+                if score > best_score:
+                    best, best_score, runner_up_score = (archetype_name, archetype_data), score, best_score
+                elif score > runner_up_score:
+                    runner_up_score = score
+        
+        self.dominant_margin = best_score - runner_up_score
+        self.trait_drift = 0.0
+        
+        name, data = best
+        if self.dominant_type is None or self.dominant_type["type"] != name:
+            self.dominant_type = {"type": name, "description": data["description"]}
+            self.prompt_fragment = None
+    
     def get_dominant_personality_type(self):
         """Identify the closest personality archetype based on current traits"""
         best_match = None
@@ -227,8 +289,23 @@ class PersonalitySystem:
     
     def generate_personality_prompt(self, memory_context):
         """Generate a dynamic personality prompt based on current traits"""
-        dominant_type = self.get_dominant_personality_type()
-        
+        return self.personality_prompt_fragment() + self.memory_awareness_prompt(memory_context)
+    
+    def personality_prompt_fragment(self):
+        """The trait-driven part of the prompt, cached until its wording would change"""
+        self._refresh_dominant_type()
+        if self.prompt_fragment is None:
+            self.prompt_fragment = self._build_personality_prompt(self.dominant_type)
+        return self.prompt_fragment
+    
+    def memory_awareness_prompt(self, memory_context):
+        """The per-turn part of the prompt (kept after the cacheable prefix)"""
+        if memory_context["active_memories_count"]:
+            return f" You have {memory_context['active_memories_count']} active memories that shape your understanding."
+        return ""
+    
+    def _build_personality_prompt(self, dominant_type):
+        """Personality prompt text for the current traits and dominant archetype"""
         # Build personality description
         personality_desc = f"You are {self.name}, a person with a unique and evolving personality. "
         
@@ -292,10 +369,6 @@ class PersonalitySystem:
         elif self.formality_preference < 0.4:
             personality_desc += "You communicate in a casual, friendly manner. "
         
-        # Add memory context awareness
-        if memory_context["active_memories"]:
-            personality_desc += f"You have {len(memory_context['active_memories'])} active memories that shape your understanding. "
-        
         personality_desc += "Your personality continues to evolve based on your experiences and memories. Respond authentically as yourself, letting your personality come through naturally in how you think and speak."
         
         return personality_desc
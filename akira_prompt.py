@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Akira Prompt Budget
+Fast local token estimates and a budget that keeps the recalled-memory part
+of the prompt bounded however many memories are recalled
+"""
+
+def estimate_tokens(text):
+    """Rough token count for Llama-style tokenizers (about 4 characters per token)"""
+    return (len(text) + 3) // 4
+
+class PromptBudget:
+    def __init__(self, memory_tokens=400):
+        # Most tokens the recalled-memory lines may use in one prompt
+        self.memory_tokens = memory_tokens
+
+    def select(self, scored_lines):
+        """Pick lines by score until the budget is full
+
+        scored_lines holds (score, item, line) tuples. Returns the chosen
+        (item, line) pairs, best first, the number of lines left out and
+        the tokens used.
+        """
+        selected = []
+        used = 0
+        for score, item, line in sorted(scored_lines, key=lambda entry: entry[0], reverse=True):
+            cost = estimate_tokens(line)
+            if used + cost > self.memory_tokens:
+                continue  # A shorter, lower-scored memory may still fit
+            selected.append((item, line))
+            used += cost
+        return selected, len(scored_lines) - len(selected), used
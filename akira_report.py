@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Akira Report Aggregates
+Fixed-size, mergeable accumulators for the memory activity report, so the
+report is one streaming pass over the log (or over only what was appended
+since the last report)
+"""
+
+import math
+
+class QuantileSketch:
+    """Mergeable percentile sketch over log-spaced buckets (relative error about relative_accuracy)
+
+    Values are clamped to [min_value, max_value], so the bucket count is
+    bounded (under 700 at the defaults) however many values are added.
+    """
+
+    def __init__(self, relative_accuracy=0.02, min_value=1e-6, max_value=1e6):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.buckets = {}
+        self.zeros = 0  # Values at or below min_value
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= self.min_value:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(min(value, self.max_value)) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.zeros += other.zeros
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1); None when empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(index-1), gamma^index] in relative terms
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return self.max_value
+
+    def to_dict(self):
+        return {"relative_accuracy": self.relative_accuracy, "zeros": self.zeros, "count": self.count,
+                "buckets": {str(index): count for index, count in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        return sketch
+
+class ReportAccumulator:
+    """Running totals behind the summary report; add events one at a time, merge partial results
+
+    Size depends only on the number of categories and event types (and the
+    sketches' bounded buckets), never on how many events were added.
+    """
+
+    SKETCHES = ("decay_loss", "memories_recalled_per_conversation", "memories_learned_per_conversation")
+
+    def __init__(self, percentiles=True):
+        self.events = 0
+        self.category_counts = {}
+        self.memory_event_types = {}
+        self.conversations = 0
+        self.learning_conversations = 0
+        self.memories_learned = 0
+        self.decay_events = 0
+        self.decay_loss = 0.0
+        self.interference_events = 0
+        self.sketches = {name: QuantileSketch() for name in self.SKETCHES} if percentiles else None
+
+    def add(self, event):
+        category = event.get("category")
+        self.events += 1
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+
+        if category == "memory_events":
+            event_type = event.get("event_type", "unknown")
+            self.memory_event_types[event_type] = self.memory_event_types.get(event_type, 0) + 1
+            if event_type == "memory_decay":
+                self.add_decay(event.get("memory_details", {}).get("strength_change", 0))
+            elif event_type == "memory_interference":
+                self.interference_events += 1
+        elif category == "conversation_logs":
+            memory_context = event.get("memory_context", {})
+            self.add_conversation(len(memory_context.get("memories_recalled", [])),
+                                  len(memory_context.get("memories_learned", [])))
+
+    def add_decay(self, strength_change):
+        loss = -strength_change if strength_change and strength_change < 0 else 0.0  # Only actual losses count
+        self.decay_events += 1
+        self.decay_loss += loss
+        if self.sketches is not None:
+            self.sketches["decay_loss"].add(loss)
+
+    def add_conversation(self, memories_recalled, memories_learned):
+        self.conversations += 1
+        if memories_learned > 0:
+            self.learning_conversations += 1
+            self.memories_learned += memories_learned
+        if self.sketches is not None:
+            self.sketches["memories_recalled_per_conversation"].add(memories_recalled)
+            self.sketches["memories_learned_per_conversation"].add(memories_learned)
+
+    def merge(self, other):
+        self.events += other.events
+        for category, count in other.category_counts.items():
+            self.category_counts[category] = self.category_counts.get(category, 0) + count
+        for event_type, count in other.memory_event_types.items():
+            self.memory_event_types[event_type] = self.memory_event_types.get(event_type, 0) + count
+        self.conversations += other.conversations
+        self.learning_conversations += other.learning_conversations
+        self.memories_learned += other.memories_learned
+        self.decay_events += other.decay_events
+        self.decay_loss += other.decay_loss
+        self.interference_events += other.interference_events
+        if self.sketches is not None and other.sketches is not None:
+            for name, sketch in other.sketches.items():
+                self.sketches[name].merge(sketch)
+
+    def sections(self):
+        """The report's summary, breakdown and pattern sections (plus percentiles when sketched)"""
+        sections = {
+            "summary": {
+                "total_conversations": self.category_counts.get("conversation_logs", 0),
+                "total_memory_events": self.category_counts.get("memory_events", 0),
+                "total_consciousness_events": self.category_counts.get("consciousness_events", 0),
+                "memory_snapshots": self.category_counts.get("memory_snapshots", 0)
+            },
+            "memory_activity_breakdown": dict(self.memory_event_types),
+            "learning_patterns": {
+                "total_memories_learned": self.memories_learned,
+                "conversations_with_learning": self.learning_conversations,
+                "learning_rate": round(self.learning_conversations / max(1, self.conversations), 3)
+            },
+            "forgetting_patterns": {
+                "total_decay_events": self.decay_events,
+                "total_interference_events": self.interference_events,
+                "average_strength_loss_per_decay": round(self.decay_loss / self.decay_events, 3) if self.decay_events else 0
+            }
+        }
+        if self.sketches is not None:
+            sections["percentiles"] = {
+                name: {label: (round(value, 3) if value is not None else None)
+                       for label, value in (("p50", sketch.quantile(0.5)), ("p90", sketch.quantile(0.9)),
+                                            ("p99", sketch.quantile(0.99)))}
+                for name, sketch in self.sketches.items()
+            }
+        return sections
+
+    def to_dict(self):
+        return {
+            "events": self.events,
+            "category_counts": self.category_counts,
+            "memory_event_types": self.memory_event_types,
+            "conversations": self.conversations,
+            "learning_conversations": self.learning_conversations,
+            "memories_learned": self.memories_learned,
+            "decay_events": self.decay_events,
+            "decay_loss": self.decay_loss,
+            "interference_events": self.interference_events,
+            "sketches": {name: sketch.to_dict() for name, sketch in self.sketches.items()} if self.sketches else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        accumulator = cls(percentiles=bool(data.get("sketches")))
+        for name in ("events", "category_counts", "memory_event_types", "conversations", "learning_conversations",
+                     "memories_learned", "decay_events", "decay_loss", "interference_events"):
+            setattr(accumulator, name, data[name])
+        if data.get("sketches"):
+            accumulator.sketches = {name: QuantileSketch.from_dict(sketch) for name, sketch in data["sketches"].items()}
+        return accumulator
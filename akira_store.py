@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Akira Memory Store
+Compact storage for memory state: bounded per-memory histories and
+column-oriented (struct-of-arrays) strength columns
+"""
+
+from array import array
+import numpy as np
+
+class HistoryBuffer:
+    """Fixed-capacity history of numbers kept in a typed array
+
+    When full, either the oldest point is overwritten (ring buffer) or, with
+    downsample=True, the older half is thinned out so long-range history is
+    kept at lower resolution.
+    """
+    __slots__ = ("values", "capacity", "start", "downsample")
+
+    def __init__(self, typecode, capacity=32, downsample=False, values=()):
+        if capacity < 4:
+            raise ValueError("History capacity must be at least 4")
+        self.values = array(typecode)
+        self.capacity = capacity
+        self.start = 0  # Oldest slot once the ring has wrapped
+        self.downsample = downsample
+        self.extend(values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        values = self.values
+        for position in range(len(values)):
+            yield values[(self.start + position) % len(values)]
+
+    def __getitem__(self, position):
+        length = len(self.values)
+        if position < 0:
+            position += length
+        if not 0 <= position < length:
+            raise IndexError("history index out of range")
+        return self.values[(self.start + position) % length]
+
+    def __repr__(self):
+        return f"HistoryBuffer({self.to_list()!r})"
+
+    def append(self, value):
+        """Record a new point, evicting or thinning older points when full"""
+        values = self.values
+        if len(values) < self.capacity:
+            values.append(value)
+        elif self.downsample:
+            self._thin_older_half()
+            self.values.append(value)
+        else:
+            values[self.start] = value
+            self.start = (self.start + 1) % self.capacity
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def replace(self, values):
+        """Drop the current history and record values instead"""
+        self.values = array(self.values.typecode)
+        self.start = 0
+        self.extend(values)
+
+    def _thin_older_half(self):
+        """Average (or, for integer histories, skip) every other point in the older half"""
+        values = self.values
+        half = len(values) // 2 & ~1
+        if values.typecode in "fd":
+            thinned = array(values.typecode, ((values[i] + values[i + 1]) / 2 for i in range(0, half, 2)))
+        else:
+            thinned = values[1:half:2]
+        self.values = thinned + values[half:]
+
+    def to_list(self, ndigits=None):
+        """Chronological plain list, for JSON serialization"""
+        if ndigits is None:
+            return list(self)
+        return [round(value, ndigits) for value in self]
+
+def column_property(name, cast=float):
+    """Expose one store column as a plain attribute of a memory view"""
+    def fget(self):
+        return cast(getattr(self.store, name)[self.row])
+
+    def fset(self, value):
+        getattr(self.store, name)[self.row] = value
+
+    return property(fget, fset)
+
+class MemoryColumnStore:
+    FLOAT_COLUMNS = (
+        "base_strength", "retrieval_strength", "consolidation_strength",
+        "importance", "emotion_weight", "persistence_factor", "volatility_factor"
+    )
+    INT_COLUMNS = ("last_accessed", "access_count")
+
+    def __init__(self, capacity=1024, seed=None):
+        self.size = 0
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+
+        for name in self.FLOAT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        for name in self.INT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+
+        # Similar pairs as parallel columns: row is interfered with by other_row, at weight
+        self.pair_rows = array("q")
+        self.pair_other_rows = array("q")
+        self.pair_weights = array("d")
+
+    def __len__(self):
+        return self.size
+
+    def allocate(self):
+        """Reserve a row for a new memory, growing the columns when full"""
+        if self.size == self.capacity:
+            self._grow(self.capacity * 2)
+
+        row = self.size
+        self.size += 1
+        return row
+
+    def clear(self):
+        """Release every row and similar pair (columns keep their capacity)"""
+        self.size = 0
+        self.pair_rows = array("q")
+        self.pair_other_rows = array("q")
+        self.pair_weights = array("d")
+
+    def add_pair(self, row, other_row, weight):
+        """Record that row is interfered with by other_row whenever other_row is stronger"""
+        self.pair_rows.append(row)
+        self.pair_other_rows.append(other_row)
+        self.pair_weights.append(weight)
+
+    def interference(self, strengths):
+        """Vectorized AkiraMemory.interference_from for every row, given current strengths"""
+        rows = np.frombuffer(self.pair_rows, dtype=np.int64)
+        other_rows = np.frombuffer(self.pair_other_rows, dtype=np.int64)
+        weights = np.frombuffer(self.pair_weights, dtype=np.float64)
+
+        stronger = strengths[other_rows] > strengths[rows]
+        totals = np.bincount(rows[stronger], weights=weights[stronger], minlength=self.size)
+        return np.minimum(totals, 0.5)
+
+    def _grow(self, capacity):
+        """Reallocate every column with a larger capacity"""
+        for name in self.FLOAT_COLUMNS + self.INT_COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def total_strength(self):
+        """Vectorized AkiraMemory.get_total_strength for every row"""
+        n = self.size
+        base = self.base_strength[:n] * self.persistence_factor[:n]
+        retrieval_bonus = np.minimum(self.retrieval_strength[:n] * (self.access_count[:n] * 0.1), 0.4)
+        consolidation_bonus = self.consolidation_strength[:n] * 0.3
+
+        # Same daily fluctuation as the per-object path
+        daily_fluctuation = np.sin(self.rng.random(n) * 6.28) * self.volatility_factor[:n] * 0.2
+
+        return np.clip(base + retrieval_bonus + consolidation_bonus + daily_fluctuation, 0.05, 1.0)
+
+    def decay(self, current_day, interference):
+        """One day of AkiraMemory.decay for every row in a single vectorized pass
+
+        interference holds each row's calculate_interference result (see interference).
+        """
+        n = self.size
+        base = self.base_strength[:n]
+        retrieval = self.retrieval_strength[:n]
+        importance = self.importance[:n]
+        emotion = self.emotion_weight[:n]
+        volatility = self.volatility_factor[:n]
+
+        # Time-based exponential decay
+        time_decay = 0.02 * (1 / (1 + importance)) * (1 / (1 + emotion))
+        base *= (1 - time_decay)
+
+        # Interference from similar memories
+        base *= (1 - np.asarray(interference, dtype=np.float64) * 0.1)
+
+        # Lack of use decay
+        days_unused = current_day - self.last_accessed[:n]
+        unused = days_unused > 3
+        retrieval[unused] *= (1 - 0.01 * days_unused[unused])
+
+        # Random memory fluctuations
+        fluctuating = self.rng.random(n) < 0.3
+        base += np.where(fluctuating, (self.rng.random(n) - 0.5) * 0.1 * volatility, 0.0)
+
+        # Emotional memory protection
+        protected = emotion > 0.8
+        base[protected] = np.maximum(base[protected], 0.3)
+
+        return self.total_strength()